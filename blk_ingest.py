@@ -8,30 +8,33 @@ Creates staging tables and resolves to existing canonical weapons/manufacturers.
 """
 
 import os
-import re
 import sys
 import argparse
+import hashlib
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
 
-from pydantic import BaseModel
 from tqdm import tqdm
 
 from sqlalchemy import (
     create_engine, Column, Integer, BigInteger, String, Text, Boolean, DateTime,
-    ForeignKey, UniqueConstraint, Table, Float
+    ForeignKey, UniqueConstraint, Index, Table, Float, insert, text, update
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from sqlalchemy.exc import IntegrityError
 
 # Import shared components from mtf_ingest_fixed
 from mtf_ingest import (
-    Base, Weapon, WeaponAlias, ComponentType, Manufacturer, Factory,
-    get_engine_and_session, normalize_token, resolve_component_type,
+    Base, Weapon, WeaponAlias, ComponentType, Manufacturer, Factory, IngestManifest,
+    get_engine_and_session, initialize_db, normalize_token, resolve_component_type, refresh_stats_view,
+    notify_api_reload,
+    weapon_ids_by_name, insert_ignore, read_unit_file,
+    COMMIT_EVERY_FILES, PARALLEL_PARSE_MIN_FILES, PARSE_CHUNKSIZE,
     fetch_bv_pv_from_pull, enqueue_bv_pv_job,
-    USE_POSTGRES, POSTGRES_DSN, EMPTY_TOKEN_VARIANTS, BV_PV_MODE_DEFAULT,
+    USE_POSTGRES, POSTGRES_DSN, EMPTY_TOKEN_LOWER, BV_PV_MODE_DEFAULT,
     guess_parsed_type
 )
 
@@ -63,9 +66,15 @@ class Vehicle(Base):
     raw_doc = Column(Text)
     
     locations = relationship("VehicleLocation", back_populates="vehicle", cascade="all, delete-orphan")
+    armor = relationship("VehicleArmor", cascade="all, delete-orphan")
+    system_manufacturers = relationship("VehicleSystemManufacturer", cascade="all, delete-orphan")
+    manufacturers = relationship("Manufacturer", secondary="vehicle_manufacturer")
+    factories = relationship("Factory", secondary="vehicle_factory")
     
     __table_args__ = (
         UniqueConstraint("name", "model", "mul_id", name="u_vehicle_name_model_mul"),
+        # API list ORDER BY / keyset cursor (see Mech)
+        Index("ix_vehicle_list_order", "name", text("coalesce(model, '')"), "id"),
     )
 
 vehicle_manufacturer_table = Table(
@@ -88,7 +97,8 @@ class VehicleLocation(Base):
     name = Column(String, nullable=False)  # Body, Turret, Front, Rear, etc.
     position_order = Column(Integer, nullable=True)
     vehicle = relationship("Vehicle", back_populates="locations")
-    slots = relationship("VehicleSlot", back_populates="location", cascade="all, delete-orphan")
+    slots = relationship("VehicleSlot", back_populates="location", cascade="all, delete-orphan",
+                         order_by="VehicleSlot.slot_index")
     __table_args__ = (UniqueConstraint("vehicle_id", "name", name="u_vehicle_location"),)
 
 class VehicleSlot(Base):
@@ -101,6 +111,8 @@ class VehicleSlot(Base):
     component_type_id = Column(Integer, ForeignKey("component_type.id"), nullable=True)
     note = Column(Text)
     location = relationship("VehicleLocation", back_populates="slots")
+    component_type = relationship("ComponentType")
+    weapon_instance = relationship("VehicleWeaponInstance", uselist=False, back_populates="slot")
     __table_args__ = (UniqueConstraint("location_id", "slot_index", name="u_vehicle_location_slotidx"),)
 
 class VehicleWeaponInstance(Base):
@@ -110,6 +122,8 @@ class VehicleWeaponInstance(Base):
     slot_id = Column(Integer, ForeignKey("vehicle_slot.id", ondelete="CASCADE"), unique=True, index=True)
     weapon_id = Column(Integer, ForeignKey("weapon.id", ondelete="SET NULL"))
     qty = Column(Integer, default=1)
+    slot = relationship("VehicleSlot", back_populates="weapon_instance")
+    weapon = relationship("Weapon")
 
 class StagingVehicleSlot(Base):
     """Staging table for vehicle equipment before resolution"""
@@ -127,6 +141,8 @@ class StagingVehicleSlot(Base):
     resolved = Column(Boolean, default=False)
     resolution_hint = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # resolve_vehicle_staging filters on parsed_type = ? AND parsed_name IS NOT NULL
+    __table_args__ = (Index("ix_staging_vehicle_slot_type_name", "parsed_type", "parsed_name"),)
 
 class VehicleSystemManufacturer(Base):
     """System manufacturer info for vehicles (chassis, engine, armor, etc.)"""
@@ -148,8 +164,9 @@ class VehicleArmor(Base):
 # BLK Parser
 # -----------------------------
 
-class ParsedVehicle(BaseModel):
-    """Parsed BLK file data"""
+@dataclass(slots=True)
+class ParsedVehicle:
+    """Parsed BLK file data (in-process DTO, so no validation)"""
     name: Optional[str] = None
     model: Optional[str] = None
     mul_id: Optional[int] = None
@@ -165,12 +182,15 @@ class ParsedVehicle(BaseModel):
     fuel_type: Optional[str] = None
     source: Optional[str] = None
     
-    armor: List[int] = []  # armor values in order
-    equipment: Dict[str, List[str]] = {}  # location -> equipment list
-    system_manufacturers: Dict[str, str] = {}  # system_type -> manufacturer
+    armor: List[int] = field(default_factory=list)  # armor values in order
+    equipment: Dict[str, List[str]] = field(default_factory=dict)  # location -> equipment list
+    system_manufacturers: Dict[str, str] = field(default_factory=dict)  # system_type -> manufacturer
+    # (location, slot_index, raw_text, parsed_name, parsed_type) per equipment
+    # line, filled by parse_blk_text so it runs in the parse workers
+    equipment_slots: List[Tuple[str, int, str, Optional[str], str]] = field(default_factory=list)
     
-    manufacturer: List[str] = []
-    factory: List[str] = []
+    manufacturer: List[str] = field(default_factory=list)
+    factory: List[str] = field(default_factory=list)
     
     overview: Optional[str] = None
     capabilities: Optional[str] = None
@@ -179,147 +199,161 @@ class ParsedVehicle(BaseModel):
     
     raw_text: Optional[str] = None
 
-# BLK format uses XML-like tags: <TagName>\nvalue\n</TagName>
-TAG_RE = re.compile(r"<([^>]+)>\s*", re.IGNORECASE)
-CLOSE_TAG_RE = re.compile(r"</([^>]+)>\s*", re.IGNORECASE)
+# BLK tag handlers: each takes (parsed, tag_name, content, content_lines)
+def _blk_text(attr: str):
+    def handler(parsed, tag_name, content, content_lines):
+        setattr(parsed, attr, content)
+    return handler
+
+def _blk_number(attr: str, convert):
+    def handler(parsed, tag_name, content, content_lines):
+        try:
+            setattr(parsed, attr, convert(content))
+        except ValueError:
+            pass
+    return handler
+
+def _blk_armor(parsed, tag_name, content, content_lines):
+    # Armor is a list of numbers, one per line
+    armor_values = []
+    for aline in content_lines:
+        aline = aline.strip()
+        if aline:
+            try:
+                armor_values.append(int(aline))
+            except ValueError:
+                pass
+    parsed.armor = armor_values
+
+def _blk_equipment(parsed, tag_name, content, content_lines):
+    # e.g., "Body Equipment", "Turret Equipment", etc.
+    location_name = tag_name.replace("Equipment", "").strip()
+    if not location_name:
+        location_name = "Body"
+    parsed.equipment[location_name] = [line.strip() for line in content_lines if line.strip()]
+
+def _blk_system_manufacturers(parsed, tag_name, content, content_lines):
+    # Format: SYSTEM:Manufacturer Name
+    for line in content_lines:
+        if ':' in line:
+            sys_type, mfg = line.split(':', 1)
+            parsed.system_manufacturers[sys_type.strip()] = mfg.strip()
+
+def _blk_comma_list(attr: str):
+    def handler(parsed, tag_name, content, content_lines):
+        setattr(parsed, attr, [v.strip() for v in content.split(',') if v.strip()])
+    return handler
+
+# Lowercased tag -> handler; tags containing "equipment" fall through to
+# _blk_equipment, anything else (blockversion, version, ...) is ignored
+BLK_TAG_HANDLERS = {
+    "name": _blk_text("name"),
+    "model": _blk_text("model"),
+    "mul id:": _blk_number("mul_id", int),
+    "unittype": _blk_text("unit_type"),
+    "year": _blk_number("year", int),
+    "originalbuildyear": _blk_number("original_build_year", int),
+    "type": _blk_text("type_classification"),
+    "role": _blk_text("role"),
+    "motion_type": _blk_text("motion_type"),
+    "cruisemp": _blk_number("cruise_mp", int),
+    "engine_type": _blk_number("engine_type", int),
+    "tonnage": _blk_number("tonnage", float),
+    "fueltype": _blk_text("fuel_type"),
+    "source": _blk_text("source"),
+    "armor": _blk_armor,
+    "systemmanufacturers": _blk_system_manufacturers,
+    "manufacturer": _blk_comma_list("manufacturer"),
+    "primaryfactory": _blk_comma_list("factory"),
+    "overview": _blk_text("overview"),
+    "capabilities": _blk_text("capabilities"),
+    "deployment": _blk_text("deployment"),
+    "history": _blk_text("history"),
+}
+
+def _apply_blk_tag(parsed: ParsedVehicle, tag_name: str, tag_lower: str, content_lines: List[str]):
+    handler = BLK_TAG_HANDLERS.get(tag_lower)
+    if handler is None:
+        if "equipment" not in tag_lower:
+            return
+        handler = _blk_equipment
+    handler(parsed, tag_name, "\n".join(content_lines).strip(), content_lines)
+
+def _blk_close_tag(line: str) -> Optional[str]:
+    """Lowercased name of a "</Tag>" line, or None"""
+    end = line.find(">", 2)
+    return line[2:end].strip().lower() if end > 2 else None
+
+def classify_equipment(equipment: Dict[str, List[str]]) -> List[Tuple[str, int, str, Optional[str], str]]:
+    """Normalize and type every equipment line; pure CPU, no DB access"""
+    return [
+        (loc_name, idx, raw_line, normalize_token(raw_line), guess_parsed_type(raw_line))
+        for loc_name, items in equipment.items()
+        for idx, raw_line in enumerate((line.strip() for line in items), start=1)
+    ]
 
 def parse_blk_text(text: str) -> ParsedVehicle:
     """
-    Parse BLK file format with XML-like tags.
+    Parse BLK file format with XML-like tags: <TagName>\nvalue\n</TagName>.
     Tags can contain spaces and special characters (e.g., "mul id:", "Body Equipment").
     """
-    lines = text.splitlines()
     parsed = ParsedVehicle(raw_text=text)
     
-    i = 0
-    while i < len(lines):
-        line = lines[i].rstrip()
-        
-        # Try to match opening tag
-        tag_match = TAG_RE.match(line)
-        if not tag_match:
-            i += 1
-            continue
-        
-        tag_name = tag_match.group(1).strip()
-        tag_lower = tag_name.lower()
-        
-        # Collect content until closing tag
-        content_lines = []
-        i += 1
-        
-        # Look for closing tag
-        while i < len(lines):
-            close_match = CLOSE_TAG_RE.match(lines[i])
-            if close_match and close_match.group(1).strip().lower() == tag_lower:
-                # Found closing tag
-                i += 1
-                break
-            content_lines.append(lines[i].rstrip())
-            i += 1
-        
-        # Join content (strip empty lines)
-        content = "\n".join(content_lines).strip()
-        
-        # Map tags to model fields
-        if tag_lower == "name":
-            parsed.name = content
-        elif tag_lower == "model":
-            parsed.model = content
-        elif tag_lower == "mul id:":
-            try:
-                parsed.mul_id = int(content)
-            except:
-                pass
-        elif tag_lower == "unittype":
-            parsed.unit_type = content
-        elif tag_lower == "year":
-            try:
-                parsed.year = int(content)
-            except:
-                pass
-        elif tag_lower == "originalbuildyear":
-            try:
-                parsed.original_build_year = int(content)
-            except:
-                pass
-        elif tag_lower == "type":
-            parsed.type_classification = content
-        elif tag_lower == "role":
-            parsed.role = content
-        elif tag_lower == "motion_type":
-            parsed.motion_type = content
-        elif tag_lower == "cruisemp":
-            try:
-                parsed.cruise_mp = int(content)
-            except:
-                pass
-        elif tag_lower == "engine_type":
-            try:
-                parsed.engine_type = int(content)
-            except:
-                pass
-        elif tag_lower == "tonnage":
-            try:
-                parsed.tonnage = float(content)
-            except:
-                pass
-        elif tag_lower == "fueltype":
-            parsed.fuel_type = content
-        elif tag_lower == "source":
-            parsed.source = content
-        elif tag_lower == "armor":
-            # Armor is a list of numbers, one per line
-            armor_values = []
-            for aline in content_lines:
-                aline = aline.strip()
-                if aline:
-                    try:
-                        armor_values.append(int(aline))
-                    except:
-                        pass
-            parsed.armor = armor_values
-        elif "equipment" in tag_lower:
-            # e.g., "Body Equipment", "Turret Equipment", etc.
-            location_name = tag_name.replace("Equipment", "").strip()
-            if not location_name:
-                location_name = "Body"
-            equipment_items = [line.strip() for line in content_lines if line.strip()]
-            parsed.equipment[location_name] = equipment_items
-        elif tag_lower == "systemmanufacturers":
-            # Parse system manufacturers
-            # Format: SYSTEM:Manufacturer Name
-            for line in content_lines:
-                if ':' in line:
-                    parts = line.split(':', 1)
-                    sys_type = parts[0].strip()
-                    mfg = parts[1].strip()
-                    parsed.system_manufacturers[sys_type] = mfg
-        elif tag_lower == "manufacturer":
-            # Can be comma-separated
-            parsed.manufacturer = [m.strip() for m in content.split(',') if m.strip()]
-        elif tag_lower == "primaryfactory":
-            parsed.factory = [f.strip() for f in content.split(',') if f.strip()]
-        elif tag_lower == "overview":
-            parsed.overview = content
-        elif tag_lower == "capabilities":
-            parsed.capabilities = content
-        elif tag_lower == "deployment":
-            parsed.deployment = content
-        elif tag_lower == "history":
-            parsed.history = content
-        elif tag_lower == "blockversion":
-            pass  # metadata, ignore
+    # Single pass: tag_name is None between tags, otherwise content_lines
+    # collects until the matching (case-insensitive) closing tag
+    tag_name = None
+    tag_lower = None
+    content_lines = []
+    for line in text.splitlines():
+        if tag_name is None:
+            if line[:1] != "<" or line[1:2] == "/":
+                continue
+            end = line.find(">", 1)
+            if end < 2:
+                continue
+            tag_name = line[1:end].strip()
+            tag_lower = tag_name.lower()
+            content_lines = []
+        elif line[:2] == "</" and _blk_close_tag(line) == tag_lower:
+            _apply_blk_tag(parsed, tag_name, tag_lower, content_lines)
+            tag_name = None
         else:
-            # Unknown tag, could store in a generic dict if needed
-            pass
+            content_lines.append(line.rstrip())
+    
+    # Unclosed final tag: its content runs to end of file
+    if tag_name is not None:
+        _apply_blk_tag(parsed, tag_name, tag_lower, content_lines)
     
+    parsed.equipment_slots = classify_equipment(parsed.equipment)
     return parsed
 
-def ingest_parsed_vehicle(session, parsed: ParsedVehicle, source_filename: str, bv_pv_mode: str = BV_PV_MODE_DEFAULT) -> Tuple[int, List[int]]:
+def load_name_caches(session) -> Dict[str, Dict[str, int]]:
+    """Preload manufacturer/factory name -> id maps for a run"""
+    return {
+        "manufacturer": {name: mid for mid, name in session.query(Manufacturer.id, Manufacturer.name)},
+        "factory": {name: fid for fid, name in session.query(Factory.id, Factory.name)},
+    }
+
+def get_or_create_name_id(session, model, cache: Dict[str, int], name: str) -> int:
+    """Look up a Manufacturer/Factory id by name, inserting it on a cache miss"""
+    name = name.strip()
+    name_id = cache.get(name)
+    if name_id is None:
+        name_id = session.execute(insert(model).values(name=name).returning(model.id)).scalar_one()
+        cache[name] = name_id
+    return name_id
+
+# BLK <armor> values are listed in this location order
+VEHICLE_ARMOR_LOCATIONS = ("front", "left", "right", "rear", "turret")
+
+def ingest_parsed_vehicle(session, parsed: ParsedVehicle, source_filename: str, bv_pv_mode: str = BV_PV_MODE_DEFAULT,
+                          name_caches: Optional[Dict[str, Dict[str, int]]] = None) -> Tuple[int, List[int]]:
     """
     Insert vehicle and create staging rows for equipment.
     Returns (vehicle_id, list_of_staging_ids)
+    
+    name_caches is the manufacturer/factory map from load_name_caches; pass the
+    same one across files to avoid a SELECT per name.
     """
     # Ensure name is present
     name = parsed.name or "UNKNOWN"
@@ -361,97 +395,83 @@ def ingest_parsed_vehicle(session, parsed: ParsedVehicle, source_filename: str,
                 vehicle.bv = bv_val
             if pv_val is not None:
                 vehicle.pv = pv_val
-            session.flush()
         except Exception:
             pass
     elif bv_pv_mode == "enqueue":
         enqueue_bv_pv_job(session, "vehicle", name, parsed.model, mul_type="19")
 
-    staging_ids = []
+    # Create VehicleLocation rows and collect staging rows for equipment;
+    # the staging rows go in as one executemany below. Names and types were
+    # computed at parse time, only component lookups touch the DB here
+    for loc_name in parsed.equipment:
+        session.add(VehicleLocation(vehicle_id=vehicle.id, name=loc_name))
+    
+    equipment_slots = parsed.equipment_slots
+    if parsed.equipment and not equipment_slots:
+        # built by hand rather than by parse_blk_text
+        equipment_slots = classify_equipment(parsed.equipment)
+    
+    external_id = str(parsed.mul_id) if parsed.mul_id else name
+    staging_rows = [
+        {
+            "file_name": source_filename,
+            "vehicle_external_id": external_id,
+            "location_name": loc_name,
+            "slot_index": idx,
+            "raw_text": raw_line,
+            "parsed_name": parsed_name,
+            "parsed_type": parsed_type,
+            "component_type_id": resolve_component_type(session, raw_line) if parsed_type == "component" else None,
+            "resolved": False
+        }
+        for loc_name, idx, raw_line, parsed_name, parsed_type in equipment_slots
+    ]
     
-    # Create VehicleLocation and staging slots for equipment
-    for loc_name, items in parsed.equipment.items():
-        loc = VehicleLocation(vehicle_id=vehicle.id, name=loc_name)
-        session.add(loc)
-        session.flush()
-        
-        for idx, raw_line in enumerate(items, start=1):
-            raw_line = raw_line.strip()
-            parsed_name = normalize_token(raw_line)
-            parsed_type = guess_parsed_type(raw_line)
-            component_type_id = None
-            if parsed_type == "component":
-                component_type_id = resolve_component_type(session, raw_line)
-            
-            s = StagingVehicleSlot(
-                file_name=source_filename,
-                vehicle_external_id=str(parsed.mul_id) if parsed.mul_id else name,
-                location_name=loc_name,
-                slot_index=idx,
-                raw_text=raw_line,
-                parsed_name=parsed_name,
-                parsed_type=parsed_type,
-                component_type_id=component_type_id,
-                resolved=False
-            )
-            session.add(s)
-            session.flush()
-            staging_ids.append(s.id)
+    staging_ids = []
+    if staging_rows:
+        # RETURNING with executemany: one round trip on Postgres and SQLite >= 3.35
+        staging_ids = list(session.scalars(
+            insert(StagingVehicleSlot).returning(StagingVehicleSlot.id, sort_by_parameter_order=True),
+            staging_rows
+        ))
     
     # Store armor values
-    armor_locations = ["front", "left", "right", "rear", "turret"]
-    for i, points in enumerate(parsed.armor):
-        if i < len(armor_locations):
-            armor = VehicleArmor(
-                vehicle_id=vehicle.id,
-                location=armor_locations[i],
-                points=points
-            )
-            session.add(armor)
+    # zip stops at the shorter side, so extra armor values are dropped
+    armor_rows = [
+        {"vehicle_id": vehicle.id, "location": location, "points": points}
+        for location, points in zip(VEHICLE_ARMOR_LOCATIONS, parsed.armor)
+    ]
+    # .values(list) renders one multi-row INSERT ... VALUES per table, a single
+    # statement on every driver (plain executemany is per-row on psycopg2)
+    if armor_rows:
+        session.execute(insert(VehicleArmor).values(armor_rows))
     
     # Store system manufacturers
-    for sys_type, mfg_name in parsed.system_manufacturers.items():
-        sys_mfg = VehicleSystemManufacturer(
-            vehicle_id=vehicle.id,
-            system_type=sys_type,
-            manufacturer_name=mfg_name
-        )
-        session.add(sys_mfg)
-    
-    # Link to manufacturers
-    for mname in parsed.manufacturer:
-        mname = mname.strip()
-        if not mname:
-            continue
-        m = session.query(Manufacturer).filter(Manufacturer.name == mname).one_or_none()
-        if not m:
-            m = Manufacturer(name=mname)
-            session.add(m)
-            session.flush()
-        try:
-            session.execute(vehicle_manufacturer_table.insert().values(
-                vehicle_id=vehicle.id, manufacturer_id=m.id
-            ))
-        except IntegrityError:
-            session.rollback()
-    
-    # Link to factories
-    for fname in parsed.factory:
-        fname = fname.strip()
-        if not fname:
-            continue
-        f = session.query(Factory).filter(Factory.name == fname).one_or_none()
-        if not f:
-            f = Factory(name=fname)
-            session.add(f)
-            session.flush()
-        try:
-            session.execute(vehicle_factory_table.insert().values(
-                vehicle_id=vehicle.id, factory_id=f.id
-            ))
-        except IntegrityError:
-            session.rollback()
-    
+    sys_mfg_rows = [
+        {"vehicle_id": vehicle.id, "system_type": sys_type, "manufacturer_name": mfg_name}
+        for sys_type, mfg_name in parsed.system_manufacturers.items()
+    ]
+    if sys_mfg_rows:
+        session.execute(insert(VehicleSystemManufacturer).values(sys_mfg_rows))
+    
+    # Link to manufacturers and factories
+    if name_caches is None:
+        name_caches = load_name_caches(session)
+    mfr_ids = [get_or_create_name_id(session, Manufacturer, name_caches["manufacturer"], mname)
+               for mname in parsed.manufacturer if mname.strip()]
+    if mfr_ids:
+        session.execute(insert_ignore(session, vehicle_manufacturer_table).values([
+            {"vehicle_id": vehicle.id, "manufacturer_id": mid} for mid in dict.fromkeys(mfr_ids)
+        ]))
+    
+    factory_ids = [get_or_create_name_id(session, Factory, name_caches["factory"], fname)
+                   for fname in parsed.factory if fname.strip()]
+    if factory_ids:
+        session.execute(insert_ignore(session, vehicle_factory_table).values([
+            {"vehicle_id": vehicle.id, "factory_id": fid} for fid in dict.fromkeys(factory_ids)
+        ]))
+    
+    # Pending ORM changes (locations, bv/pv, queued job) go out in this one flush
     session.flush()
     return vehicle.id, staging_ids
 
@@ -468,28 +488,22 @@ def resolve_vehicle_staging(session):
         StagingVehicleSlot.parsed_name != None
     ).all()
     
-    for s in rows:
-        if s.resolved and s.weapon_id:
-            continue
-        if s.parsed_name is None:
-            continue
-        
-        # Try exact match
-        w = session.query(Weapon).filter(Weapon.name == s.parsed_name).one_or_none()
-        if w:
-            s.weapon_id = w.id
-            s.resolved = True
+    pending = [s for s in rows if not (s.resolved and s.weapon_id) and s.parsed_name is not None]
+    # Two IN-queries for all distinct names instead of two SELECTs per row
+    exact, alias = weapon_ids_by_name(session, (s.parsed_name for s in pending))
+    
+    for s in pending:
+        # Try exact match, then alias match
+        if s.parsed_name in exact:
+            s.weapon_id = exact[s.parsed_name]
             s.resolution_hint = "exact"
-            updated += 1
-            continue
-        
-        # Try alias match
-        a = session.query(WeaponAlias).filter(WeaponAlias.alias == s.parsed_name).one_or_none()
-        if a:
-            s.weapon_id = a.weapon_id
-            s.resolved = True
+        elif s.parsed_name in alias:
+            s.weapon_id = alias[s.parsed_name]
             s.resolution_hint = "alias"
-            updated += 1
+        else:
+            continue
+        s.resolved = True
+        updated += 1
     
     session.flush()
 
@@ -525,76 +539,89 @@ def resolve_vehicle_staging(session):
 def finalize_vehicle_slots(session):
     """
     Move resolved staging_vehicle_slot to final vehicle_slot and vehicle_weapon_instance.
+    Vehicles, locations and existing slots are looked up from dicts built up
+    front; new rows go in as one executemany per table.
     """
     rows = session.query(StagingVehicleSlot).filter(
         StagingVehicleSlot.resolved == True
     ).all()
     
-    created_slots = 0
-    created_winst = 0
-    
+    vehicles_by_mul = dict(session.query(Vehicle.mul_id, Vehicle.id).filter(Vehicle.mul_id != None))
+    vehicles_by_name: Dict[str, int] = {}
+    for vname, vid in session.query(Vehicle.name, Vehicle.id).order_by(Vehicle.id):
+        vehicles_by_name.setdefault(vname, vid)
+    locations = {
+        (vid, lname): lid
+        for lid, vid, lname in session.query(VehicleLocation.id, VehicleLocation.vehicle_id, VehicleLocation.name)
+    }
+    taken_slots = set(session.query(VehicleSlot.location_id, VehicleSlot.slot_index).all())
+    
+    # (vehicle_id, location_name, slot row, weapon_id) per slot to create
+    pending = []
+    new_locations: Dict[Tuple[int, str], None] = {}
     for s in tqdm(rows, desc="finalizing vehicle slots", leave=False):
-        # Find vehicle
-        vehicle = None
+        # Find vehicle: mul_id when the external id is numeric, else by name
+        vehicle_id = None
         if s.vehicle_external_id:
             try:
-                vid = int(s.vehicle_external_id)
-                vehicle = session.query(Vehicle).filter(Vehicle.mul_id == vid).one_or_none()
-            except:
-                # Try by name
-                vehicle = session.query(Vehicle).filter(
-                    Vehicle.name == s.vehicle_external_id
-                ).first()
+                vehicle_id = vehicles_by_mul.get(int(s.vehicle_external_id))
+            except ValueError:
+                vehicle_id = vehicles_by_name.get(s.vehicle_external_id)
         
-        if not vehicle:
+        if not vehicle_id:
             continue
         
         # Find or create location
-        loc = session.query(VehicleLocation).filter(
-            VehicleLocation.vehicle_id == vehicle.id,
-            VehicleLocation.name == s.location_name
-        ).one_or_none()
-        
-        if not loc:
-            loc = VehicleLocation(vehicle_id=vehicle.id, name=s.location_name)
-            session.add(loc)
-            session.flush()
-        
-        # Check if slot already exists
-        existing_slot = session.query(VehicleSlot).filter(
-            VehicleSlot.location_id == loc.id,
-            VehicleSlot.slot_index == s.slot_index
-        ).one_or_none()
-        
-        if existing_slot:
-            continue
+        loc_key = (vehicle_id, s.location_name)
+        if loc_key not in locations:
+            new_locations[loc_key] = None
         
         # Create slot
         note = None
-        if s.raw_text and s.raw_text.strip().lower() in {v.lower() for v in EMPTY_TOKEN_VARIANTS}:
+        if s.raw_text and s.raw_text.strip().lower() in EMPTY_TOKEN_LOWER:
             note = "Empty"
         
-        slot = VehicleSlot(
-            location_id=loc.id,
-            slot_index=s.slot_index,
-            raw_text=s.raw_text,
-            component_type_id=s.component_type_id,
-            note=note
+        pending.append((loc_key, {
+            "slot_index": s.slot_index,
+            "raw_text": s.raw_text,
+            "component_type_id": s.component_type_id,
+            "note": note
+        }, s.weapon_id))
+    
+    if new_locations:
+        new_ids = session.scalars(
+            insert(VehicleLocation).returning(VehicleLocation.id, sort_by_parameter_order=True),
+            [{"vehicle_id": vid, "name": lname} for vid, lname in new_locations]
+        )
+        locations.update(zip(new_locations, new_ids))
+    
+    slot_rows = []
+    slot_weapons = []
+    for loc_key, slot_row, weapon_id in pending:
+        slot_row["location_id"] = locations[loc_key]
+        # Skip existing slots, including ones created earlier in this pass
+        key = (slot_row["location_id"], slot_row["slot_index"])
+        if key in taken_slots:
+            continue
+        taken_slots.add(key)
+        slot_rows.append(slot_row)
+        slot_weapons.append(weapon_id)
+    
+    created_slots = len(slot_rows)
+    created_winst = 0
+    if slot_rows:
+        slot_ids = session.scalars(
+            insert(VehicleSlot).returning(VehicleSlot.id, sort_by_parameter_order=True),
+            slot_rows
         )
-        session.add(slot)
-        session.flush()
-        created_slots += 1
-        
         # Create weapon instance if weapon resolved
-        if s.weapon_id:
-            winst = VehicleWeaponInstance(
-                slot_id=slot.id,
-                weapon_id=s.weapon_id,
-                qty=1
-            )
-            session.add(winst)
-            session.flush()
-            created_winst += 1
+        winst_rows = [
+            {"slot_id": slot_id, "weapon_id": weapon_id, "qty": 1}
+            for slot_id, weapon_id in zip(slot_ids, slot_weapons) if weapon_id
+        ]
+        if winst_rows:
+            session.execute(insert(VehicleWeaponInstance), winst_rows)
+        created_winst = len(winst_rows)
     
     session.flush()
     return created_slots, created_winst
@@ -607,31 +634,101 @@ def discover_blk_files(folder: Path) -> List[Path]:
     """Find all .blk files in folder"""
     return sorted([p for p in folder.glob("*.blk")] + [p for p in folder.glob("*.BLK")])
 
-def process_folder(folder: Path, session, bv_pv_mode: str = BV_PV_MODE_DEFAULT):
-    """Process all BLK files in folder"""
+def parse_blk_file(path: Path) -> Tuple[str, Optional[dict], Optional[str]]:
+    """
+    Read and parse one BLK file; top-level so process pool workers can run it.
+    Returns (file_name, asdict(ParsedVehicle) or None, error message or None)
+    """
+    try:
+        text = read_unit_file(path)
+    except Exception as e:
+        return path.name, None, f"Failed to read {path}: {e}"
+    try:
+        return path.name, asdict(parse_blk_text(text)), None
+    except Exception as e:
+        return path.name, None, f"Failed to ingest {path}: {type(e).__name__}: {e}"
+
+def file_digest(path: Path) -> Optional[str]:
+    """blake2b of the file bytes, or None if it can't be read"""
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+def record_manifest(session, manifest: Dict[str, str], file_name: str, digest: Optional[str]):
+    """Upsert a file's ingest_manifest row; manifest is the prefetched file_name -> sha map"""
+    if digest is None:
+        return
+    if file_name in manifest:
+        session.execute(update(IngestManifest).where(IngestManifest.file_name == file_name)
+                        .values(sha=digest, updated_at=datetime.utcnow()))
+    else:
+        session.add(IngestManifest(file_name=file_name, sha=digest))
+
+def process_folder(folder: Path, session, bv_pv_mode: str = BV_PV_MODE_DEFAULT, workers: Optional[int] = None,
+                   force: bool = False, commit_every: int = COMMIT_EVERY_FILES):
+    """
+    Process all BLK files in folder, committing every commit_every files.
+    Files whose content hash matches ingest_manifest are skipped unless force
+    is set. The rest are parsed in a process pool (workers=None uses every
+    core, 1 parses inline); all DB writes stay in this process on the given session.
+    """
     files = discover_blk_files(folder)
     if not files:
         print("No .blk files found in", folder)
         return
     
-    stats = {"files": 0, "staging_rows": 0}
+    stats = {"files": 0, "staging_rows": 0, "unchanged": 0}
+    name_caches = load_name_caches(session)
     
-    for f in tqdm(files, desc="files"):
-        try:
-            text = f.read_text(encoding="utf-8")
-        except Exception as e:
-            print(f"Failed to read {f}: {e}")
-            continue
-        
-        try:
-            parsed = parse_blk_text(text)
-            vehicle_id, staging_ids = ingest_parsed_vehicle(session, parsed, str(f.name), bv_pv_mode=bv_pv_mode)
-            session.commit()
+    manifest = dict(session.query(IngestManifest.file_name, IngestManifest.sha))
+    digests = {f: file_digest(f) for f in files}
+    changed = [f for f in files if force or digests[f] is None or manifest.get(f.name) != digests[f]]
+    stats["unchanged"] = len(files) - len(changed)
+    files = changed
+    
+    executor = None
+    if workers != 1 and len(files) >= PARALLEL_PARSE_MIN_FILES:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(parse_blk_file, files, chunksize=PARSE_CHUNKSIZE)
+    else:
+        results = map(parse_blk_file, files)
+    
+    uncommitted = 0
+    try:
+        for f, (file_name, data, error) in zip(files, tqdm(results, total=len(files), desc="files")):
+            if error:
+                print(error)
+                continue
+            
+            try:
+                # A failing file only rolls back its own savepoint. The ingest
+                # functions flush explicitly where they need ids, so queries
+                # don't autoflush; the rest goes out when the savepoint closes
+                with session.begin_nested(), session.no_autoflush:
+                    vehicle_id, staging_ids = ingest_parsed_vehicle(
+                        session, ParsedVehicle(**data), file_name,
+                        bv_pv_mode=bv_pv_mode, name_caches=name_caches
+                    )
+                    record_manifest(session, manifest, file_name, digests[f])
+                if digests[f] is not None:
+                    manifest[file_name] = digests[f]
+            except Exception as e:
+                # Names inserted in the rolled-back savepoint are gone again
+                name_caches = load_name_caches(session)
+                print(f"Failed to ingest {f}: {type(e).__name__}: {e}")
+                continue
+            
             stats["files"] += 1
             stats["staging_rows"] += len(staging_ids)
-        except Exception as e:
-            session.rollback()
-            print(f"Failed to ingest {f}: {type(e).__name__}: {e}")
+            uncommitted += 1
+            if uncommitted >= commit_every:
+                session.commit()
+                uncommitted = 0
+        session.commit()
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     return stats
 
@@ -643,7 +740,10 @@ def main():
     parser.add_argument("--reconcile", action="store_true", help="Resolve staging to weapons")
     parser.add_argument("--finalize", action="store_true", help="Finalize staging to production tables")
     parser.add_argument("--use-postgres", action="store_true", help="Use PostgreSQL")
+    parser.add_argument("--force", action="store_true", help="Re-ingest files even if their content hash is unchanged")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes for large folders (default: one per CPU; 1 parses inline)")
     parser.add_argument("--bv-pv-mode", choices=["enqueue", "sync", "skip"], default=BV_PV_MODE_DEFAULT, help="How to handle BV/PV lookup: enqueue for async worker (default), sync to fetch immediately, or skip")
+    parser.add_argument("--batch-size", type=int, default=COMMIT_EVERY_FILES, help=f"Files per commit (default: {COMMIT_EVERY_FILES})")
     
     args = parser.parse_args()
     
@@ -652,7 +752,7 @@ def main():
     print(f"Connecting to: {engine.url}")
     
     # Create tables
-    Base.metadata.create_all(bind=engine)
+    initialize_db(engine)
     session = Session()
     
     folder = Path(args.folder)
@@ -662,7 +762,8 @@ def main():
     
     if not args.reconcile:
         print("Beginning ingest of .blk files from", folder)
-        stats = process_folder(folder, session, bv_pv_mode=args.bv_pv_mode)
+        stats = process_folder(folder, session, bv_pv_mode=args.bv_pv_mode, workers=args.workers,
+                               force=args.force, commit_every=args.batch_size)
         print("Ingest complete:", stats)
         print("Run with --reconcile to resolve weapons, then --finalize to create final slots.")
     else:
@@ -678,6 +779,8 @@ def main():
             print(f"Created {created_slots} vehicle slots and {created_winst} weapon instances.")
     
     session.close()
+    refresh_stats_view(engine)
+    notify_api_reload()
 
 if __name__ == "__main__":
     main()
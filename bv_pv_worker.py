@@ -7,13 +7,15 @@ This worker reuses pull.py via the existing fetch_bv_pv_from_pull helper.
 
 import argparse
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from mtf_ingest import (
-    Base,
     BvPvJob,
     fetch_bv_pv_from_pull,
     get_engine_and_session,
+    initialize_db,
+    notify_api_reload,
     USE_POSTGRES,
 )
 
@@ -22,12 +24,18 @@ def fetch_next_jobs(session, limit: int):
     return session.query(BvPvJob).filter(BvPvJob.status == "pending").order_by(BvPvJob.created_at.asc()).limit(limit).all()
 
 
-def process_job(session, job: BvPvJob):
-    job.status = "processing"
-    job.attempts = (job.attempts or 0) + 1
-    job.updated_at = datetime.utcnow()
+def claim_jobs(session, jobs):
+    """Mark a fetched batch as processing in one commit so other workers skip it."""
+    now = datetime.utcnow()
+    for job in jobs:
+        job.status = "processing"
+        job.attempts = (job.attempts or 0) + 1
+        job.updated_at = now
     session.commit()
 
+
+def process_job(session, job: BvPvJob):
+    """Run the lookup for a claimed job and commit its result."""
     try:
         bv_val, pv_val = fetch_bv_pv_from_pull(job.name, job.variant, mul_type=job.mul_type)
         if bv_val is None and pv_val is None:
@@ -46,18 +54,28 @@ def process_job(session, job: BvPvJob):
         session.commit()
 
 
+def process_job_by_id(Session, job_id: int):
+    """Thread entry point: each job gets its own session."""
+    with Session() as session:
+        job = session.get(BvPvJob, job_id)
+        if job is not None:
+            process_job(session, job)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Process BV/PV lookup jobs enqueued during ingest.")
     parser.add_argument("--limit", type=int, default=10, help="Number of jobs to process per batch")
     parser.add_argument("--loop", action="store_true", help="Keep polling for new jobs")
+    parser.add_argument("--workers", type=int, default=8, help="Jobs to run concurrently (each lookup is a pull.py subprocess)")
     parser.add_argument("--sleep", type=int, default=5, help="Seconds to sleep between polls when looping")
     parser.add_argument("--use-postgres", action="store_true", help="Use PostgreSQL (overrides USE_POSTGRES)")
     args = parser.parse_args()
 
     use_postgres = USE_POSTGRES or args.use_postgres
     engine, Session = get_engine_and_session(use_postgres)
-    Base.metadata.create_all(bind=engine)
+    initialize_db(engine)
     session = Session()
+    executor = ThreadPoolExecutor(max_workers=max(1, args.workers))
 
     try:
         while True:
@@ -71,12 +89,19 @@ def main():
 
             for job in jobs:
                 print(f"Processing job {job.id}: {job.unit_kind} {job.name} {job.variant or ''} mul_type={job.mul_type}")
-                process_job(session, job)
+            job_ids = [job.id for job in jobs]
+            claim_jobs(session, jobs)
+            list(executor.map(lambda job_id: process_job_by_id(Session, job_id), job_ids))
+            # Results were committed by the worker sessions
+            session.expire_all()
+            # Cached detail responses still carry the old bv/pv
+            notify_api_reload()
 
             if not args.loop:
                 break
             time.sleep(args.sleep)
     finally:
+        executor.shutdown()
         session.close()
 
 
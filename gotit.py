@@ -18,6 +18,9 @@ def export_tables_to_txt(db_path, delimiter='|'):
     # Connect to database
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    cursor.arraysize = 1000
+    # One read transaction (and snapshot) for the whole export
+    cursor.execute("BEGIN")
     
     # Get all table names
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -38,24 +41,24 @@ def export_tables_to_txt(db_path, delimiter='|'):
             # Write table header
             writer.writerow([f"=== TABLE: {table} ==="])
             
-            # Get column names
-            cursor.execute(f"PRAGMA table_info({table})")
-            columns = [col[1] for col in cursor.fetchall()]
-            writer.writerow(columns)
-            
-            # Get first 10 rows
-            cursor.execute(f"SELECT * FROM {table} LIMIT 10")
+            # Get first 10 rows; column names come from cursor.description.
+            # table is a name read from sqlite_master, quoted as an identifier.
+            # Without the LIMIT, pass the cursor itself to writerows so memory
+            # stays bounded by arraysize
+            quoted = table.replace('"', '""')
+            cursor.execute(f'SELECT * FROM "{quoted}" LIMIT 10')
+            columns = [col[0] for col in cursor.description]
             rows = cursor.fetchall()
             
-            # Write rows
-            for row in rows:
-                writer.writerow(row)
+            writer.writerow(columns)
+            writer.writerows(rows)
             
             # Add blank line between tables
             writer.writerow([])
             
             print(f"  Exported {len(rows)} rows")
     
+    conn.commit()
     conn.close()
     print(f"\nExport complete! Output saved to: {output_file}")
 
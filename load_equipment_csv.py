@@ -10,21 +10,65 @@ import re
 import csv
 import argparse
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Set, FrozenSet, Iterator, Optional, Tuple
+from functools import lru_cache
 from datetime import datetime
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import IntegrityError
 
 # Import from your existing mtf_ingest_fixed.py
 from mtf_ingest import (
-    Base, Weapon, WeaponAlias, ComponentType, 
-    get_engine_and_session, normalize_token,
-    SQLITE_FILENAME, USE_POSTGRES, POSTGRES_DSN
+    Weapon, WeaponAlias, ComponentType, 
+    get_engine_and_session, initialize_db, normalize_token, bulk_insert_ignore,
+    SQLITE_FILENAME, USE_POSTGRES, POSTGRES_DSN,
+    TOKEN_PUNCT_RE, WHITESPACE_RE
 )
 
+# Print one line per created weapon/alias/ammo row (main's --verbose);
+# otherwise each loader prints a summary line
+VERBOSE = False
 
+# Common abbreviations and expansions for generate_weapon_aliases,
+# compiled once: (word, pattern, replacements). A replacement equal to the
+# word the pattern matches would only reproduce the input, so it is dropped.
+WEAPON_EXPANSIONS = [
+    (pattern[2:-2], re.compile(pattern), [r for r in replacements if r != pattern[2:-2]])
+    for pattern, replacements in {
+        r'\bac\b': ['autocannon', 'ac'],
+        r'\blrm\b': ['long range missile', 'lrm'],
+        r'\bsrm\b': ['short range missile', 'srm'],
+        r'\bppc\b': ['particle projection cannon', 'ppc'],
+        r'\ber\b': ['extended range', 'er'],
+        r'\blaser\b': ['laser', 'las'],
+        r'\blg\b': ['large', 'lg', 'l'],
+        r'\bmed\b': ['medium', 'med', 'm'],
+        r'\bsm\b': ['small', 'sm', 's'],
+        r'\bpulse\b': ['pulse', 'p'],
+        r'\bultra\b': ['ultra', 'u'],
+        r'\bgauss\b': ['gauss rifle', 'gauss'],
+        r'\bmg\b': ['machine gun', 'mg'],
+        r'\bflamer\b': ['flamer', 'flame'],
+    }.items()
+]
+# Clan CSV rows for non-weapon items (actuators, legs, etc.); plain substring
+# matches, so 'act' also catches 'Actuator'
+CLAN_SKIP_RE = re.compile(
+    r'act|leg|shoulder|case|ecm|probe|artemis|masc|hs|heat sink|computer',
+    re.IGNORECASE
+)
+# \bword\b matches exactly when word is one of the \w+ runs of the name
+WORD_RE = re.compile(r'\w+')
+NUMBERED_NAME_RE = re.compile(r'(\D+)\s*(\d+)')
+NON_INT_CHARS_RE = re.compile(r'[^\d\-]')
+# str.translate table mapping the ASCII characters TOKEN_PUNCT_RE matches to a space
+ASCII_PUNCT_TO_SPACE = str.maketrans({
+    c: " " for c in map(chr, range(128))
+    if not (c.isalnum() or c.isspace() or c in "_-")
+})
+
+
+@lru_cache(maxsize=65536)
 def normalize_weapon_name(name: str) -> str:
     """
     Normalize weapon name to match parser's normalize_token logic.
@@ -32,16 +76,20 @@ def normalize_weapon_name(name: str) -> str:
     """
     if not name:
         return ""
+    if name.isascii():
+        # Same result as the regex path below, in one translate + split
+        return " ".join(name.translate(ASCII_PUNCT_TO_SPACE).split()).lower()
     # Remove punctuation except hyphens and spaces
-    normalized = re.sub(r"[^\w\s\-]", " ", name)
+    normalized = TOKEN_PUNCT_RE.sub(" ", name)
     # Collapse multiple spaces
-    normalized = re.sub(r"\s+", " ", normalized)
+    normalized = WHITESPACE_RE.sub(" ", normalized)
     # Lowercase and strip
     normalized = normalized.strip().lower()
     return normalized
 
 
-def generate_weapon_aliases(canonical_name: str) -> Set[str]:
+@lru_cache(maxsize=4096)
+def generate_weapon_aliases(canonical_name: str) -> FrozenSet[str]:
     """
     Generate common aliases for a weapon name.
     Examples:
@@ -58,28 +106,13 @@ def generate_weapon_aliases(canonical_name: str) -> Set[str]:
     if no_space != normalized:
         aliases.add(no_space)
     
-    # Common abbreviations and expansions
-    expansions = {
-        r'\bac\b': ['autocannon', 'ac'],
-        r'\blrm\b': ['long range missile', 'lrm'],
-        r'\bsrm\b': ['short range missile', 'srm'],
-        r'\bppc\b': ['particle projection cannon', 'ppc'],
-        r'\ber\b': ['extended range', 'er'],
-        r'\blaser\b': ['laser', 'las'],
-        r'\blg\b': ['large', 'lg', 'l'],
-        r'\bmed\b': ['medium', 'med', 'm'],
-        r'\bsm\b': ['small', 'sm', 's'],
-        r'\bpulse\b': ['pulse', 'p'],
-        r'\bultra\b': ['ultra', 'u'],
-        r'\bgauss\b': ['gauss rifle', 'gauss'],
-        r'\bmg\b': ['machine gun', 'mg'],
-        r'\bflamer\b': ['flamer', 'flame'],
-    }
-    
-    # Generate expansions
-    for pattern, replacements in expansions.items():
+    # Generate expansions, skipping patterns whose word is not in the name
+    words = set(WORD_RE.findall(normalized))
+    for word, pattern, replacements in WEAPON_EXPANSIONS:
+        if word not in words:
+            continue
         for replacement in replacements:
-            expanded = re.sub(pattern, replacement, normalized)
+            expanded = pattern.sub(replacement, normalized)
             if expanded != normalized:
                 aliases.add(expanded)
                 # Also try without spaces
@@ -92,7 +125,7 @@ def generate_weapon_aliases(canonical_name: str) -> Set[str]:
     
     # Handle number patterns
     # "ac 10" -> "ac10", "ac/10", "ac-10"
-    num_match = re.search(r'(\D+)\s*(\d+)', normalized)
+    num_match = NUMBERED_NAME_RE.search(normalized)
     if num_match:
         prefix, number = num_match.groups()
         prefix = prefix.strip()
@@ -101,144 +134,145 @@ def generate_weapon_aliases(canonical_name: str) -> Set[str]:
         aliases.add(f"{prefix}-{number}")
         aliases.add(f"{prefix}/{number}")
     
-    return aliases
+    return frozenset(aliases)
+
+
+def load_weapon_caches(session) -> Tuple[Dict[str, int], Set[str]]:
+    """Fetch every weapon name -> id and every alias in two queries"""
+    existing_weapons = dict(session.query(Weapon.name, Weapon.id).all())
+    existing_aliases = {alias for (alias,) in session.query(WeaponAlias.alias)}
+    return existing_weapons, existing_aliases
 
 
-def load_is_equipment(session, csv_path: Path) -> Dict[str, int]:
+def _insert_weapons(session, entries: List[Tuple[str, int, FrozenSet[str]]], category: str,
+                    existing_weapons: Dict[str, int], existing_aliases: Set[str]) -> Dict[str, int]:
     """
-    Load Inner Sphere equipment from battletech_equipment.txt
-    Returns mapping of canonical_name -> weapon_id
+    Bulk insert (canonical_name, damage, aliases) entries that are not in the DB yet.
+    existing_weapons / existing_aliases are updated with what gets inserted.
+    Returns mapping of canonical_name -> weapon_id for every entry.
     """
     weapon_map = {}
-    
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            weapon_name = row.get('type', '').strip()
-            if not weapon_name:
-                continue
-            
-            # Normalize the canonical name
-            canonical_name = normalize_weapon_name(weapon_name)
-            
-            # Check if weapon already exists
-            existing = session.query(Weapon).filter(Weapon.name == canonical_name).first()
-            if existing:
-                weapon_map[canonical_name] = existing.id
+    new_entries = []
+    for canonical_name, damage, aliases in entries:
+        if canonical_name in weapon_map:
+            continue
+        if canonical_name in existing_weapons:
+            weapon_map[canonical_name] = existing_weapons[canonical_name]
+            if VERBOSE:
                 print(f"  Found existing: {canonical_name}")
+            continue
+        weapon_map[canonical_name] = None
+        new_entries.append((canonical_name, damage, aliases))
+    if not new_entries:
+        print(f"  No new weapons ({len(weapon_map)} already present)")
+        return weapon_map
+
+    # CSV order is kept so weapon ids match a row-by-row load
+    rows = session.execute(
+        insert(Weapon).returning(Weapon.id, sort_by_parameter_order=True),
+        [{"name": name, "category": category, "damage": damage} for name, damage, _ in new_entries],
+    ).scalars().all()
+
+    alias_rows = []
+    for (canonical_name, _, aliases), weapon_id in zip(new_entries, rows):
+        weapon_map[canonical_name] = weapon_id
+        existing_weapons[canonical_name] = weapon_id
+        if VERBOSE:
+            print(f"  Created weapon: {canonical_name} (ID: {weapon_id})")
+        for alias in aliases:
+            # Skip the canonical name itself and aliases an earlier weapon owns
+            if alias == canonical_name or alias in existing_aliases:
                 continue
-            
-            # Create new weapon
-            weapon = Weapon(
-                name=canonical_name,
-                category='IS',  # Inner Sphere
-                damage=_parse_int(row.get('dam')),
-            )
-            session.add(weapon)
-            session.flush()
-            weapon_map[canonical_name] = weapon.id
-            print(f"  Created weapon: {canonical_name} (ID: {weapon.id})")
-            
-            # Generate and add aliases
-            aliases = generate_weapon_aliases(weapon_name)
-            for alias in aliases:
-                if alias == canonical_name:
-                    continue  # Skip the canonical name itself
-                
-                # Check if alias already exists
-                existing_alias = session.query(WeaponAlias).filter(
-                    WeaponAlias.alias == alias
-                ).first()
-                if existing_alias:
-                    continue
-                
-                try:
-                    wa = WeaponAlias(alias=alias, weapon_id=weapon.id)
-                    session.add(wa)
-                    session.flush()
-                    print(f"    Added alias: {alias}")
-                except IntegrityError:
-                    session.rollback()
+            existing_aliases.add(alias)
+            alias_rows.append({"alias": alias, "weapon_id": weapon_id})
+            if VERBOSE:
+                print(f"    Added alias: {alias}")
+    bulk_insert_ignore(session, WeaponAlias, alias_rows)
+    print(f"  Created {len(new_entries)} weapons with {len(alias_rows)} aliases "
+          f"({len(weapon_map) - len(new_entries)} already present)")
+    return weapon_map
+
+
+def _read_columns(csv_path: Path, *names: str) -> Iterator[Tuple[str, ...]]:
+    """
+    Yield the named columns of each CSV row as a tuple of strings.
+    Columns are looked up in the header once; missing cells come back as "".
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        # Last occurrence wins for duplicate headers, as with csv.DictReader
+        positions = {name: i for i, name in enumerate(header)}
+        indices = [positions.get(name, -1) for name in names]
+        for row in reader:
+            width = len(row)
+            yield tuple(row[i] if 0 <= i < width else "" for i in indices)
+
+
+def load_is_equipment(session, csv_path: Path, existing_weapons: Optional[Dict[str, int]] = None,
+                      existing_aliases: Optional[Set[str]] = None) -> Dict[str, int]:
+    """
+    Load Inner Sphere equipment from battletech_equipment.txt
+    existing_weapons / existing_aliases: caches from load_weapon_caches, shared
+    across loaders and updated in place (fetched here when not given)
+    Returns mapping of canonical_name -> weapon_id
+    """
+    if existing_weapons is None or existing_aliases is None:
+        existing_weapons, existing_aliases = load_weapon_caches(session)
+    entries = []
+    for weapon_name, damage in _read_columns(csv_path, 'type', 'dam'):
+        weapon_name = weapon_name.strip()
+        if not weapon_name:
+            continue
+        
+        # Normalize the canonical name
+        canonical_name = normalize_weapon_name(weapon_name)
+        entries.append((canonical_name, _parse_int(damage),
+                        generate_weapon_aliases(weapon_name)))
     
+    weapon_map = _insert_weapons(session, entries, 'IS',  # Inner Sphere
+                                 existing_weapons, existing_aliases)
     session.commit()
     return weapon_map
 
 
-def load_clan_equipment(session, csv_path: Path) -> Dict[str, int]:
+def load_clan_equipment(session, csv_path: Path, existing_weapons: Optional[Dict[str, int]] = None,
+                        existing_aliases: Optional[Set[str]] = None) -> Dict[str, int]:
     """
     Load Clan equipment from battletech_clan_equipment.txt
+    existing_weapons / existing_aliases: as for load_is_equipment
     Returns mapping of canonical_name -> weapon_id
     """
-    weapon_map = {}
-    
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    if existing_weapons is None or existing_aliases is None:
+        existing_weapons, existing_aliases = load_weapon_caches(session)
+    entries = []
+    for weapon_name, damage in _read_columns(csv_path, 'cl type', 'cl dam'):
+        weapon_name = weapon_name.strip()
+        if not weapon_name:
+            continue
         
-        for row in reader:
-            weapon_name = row.get('cl type', '').strip()
-            if not weapon_name:
-                continue
-            
-            # Skip non-weapon items (actuators, legs, etc.)
-            if any(skip in weapon_name.lower() for skip in [
-                'act', 'leg', 'shoulder', 'case', 'ecm', 'probe', 
-                'artemis', 'masc', 'hs', 'heat sink', 'computer'
-            ]):
-                continue
-            
-            # Normalize the canonical name
-            canonical_name = normalize_weapon_name(weapon_name)
-            # Prefix with "cl" to distinguish from IS
-            canonical_name = f"cl {canonical_name}"
-            
-            # Check if weapon already exists
-            existing = session.query(Weapon).filter(Weapon.name == canonical_name).first()
-            if existing:
-                weapon_map[canonical_name] = existing.id
-                print(f"  Found existing: {canonical_name}")
-                continue
-            
-            # Create new weapon
-            weapon = Weapon(
-                name=canonical_name,
-                category='Clan',
-                damage=_parse_int(row.get('cl dam')),
-            )
-            session.add(weapon)
-            session.flush()
-            weapon_map[canonical_name] = weapon.id
-            print(f"  Created weapon: {canonical_name} (ID: {weapon.id})")
-            
-            # Generate and add aliases (including non-prefixed versions)
-            aliases = generate_weapon_aliases(weapon_name)
-            # Add clan-prefixed versions
-            clan_aliases = set()
-            for alias in aliases:
-                clan_aliases.add(f"cl {alias}")
-                clan_aliases.add(f"clan {alias}")
-            
-            # Also add non-prefixed versions (they might appear in MTF files)
-            all_aliases = aliases | clan_aliases
-            
-            for alias in all_aliases:
-                if alias == canonical_name:
-                    continue
-                
-                existing_alias = session.query(WeaponAlias).filter(
-                    WeaponAlias.alias == alias
-                ).first()
-                if existing_alias:
-                    continue
-                
-                try:
-                    wa = WeaponAlias(alias=alias, weapon_id=weapon.id)
-                    session.add(wa)
-                    session.flush()
-                    print(f"    Added alias: {alias}")
-                except IntegrityError:
-                    session.rollback()
+        # Skip non-weapon items (actuators, legs, etc.)
+        if CLAN_SKIP_RE.search(weapon_name):
+            continue
+        
+        # Normalize the canonical name
+        canonical_name = normalize_weapon_name(weapon_name)
+        # Prefix with "cl" to distinguish from IS
+        canonical_name = f"cl {canonical_name}"
+        
+        # Generate aliases (including non-prefixed versions)
+        aliases = generate_weapon_aliases(weapon_name)
+        # Add clan-prefixed versions
+        clan_aliases = set()
+        for alias in aliases:
+            clan_aliases.add(f"cl {alias}")
+            clan_aliases.add(f"clan {alias}")
+        
+        # Also keep non-prefixed versions (they might appear in MTF files)
+        entries.append((canonical_name, _parse_int(damage),
+                        aliases | clan_aliases))
     
+    weapon_map = _insert_weapons(session, entries, 'Clan', existing_weapons, existing_aliases)
     session.commit()
     return weapon_map
 
@@ -248,36 +282,30 @@ def load_ammo(session, csv_path: Path) -> Dict[str, int]:
     Load ammunition as component types (not weapons)
     Returns mapping of canonical_name -> component_type_id
     """
-    ammo_map = {}
+    names = []
+    for (ammo_name,) in _read_columns(csv_path, 'ammo type'):
+        ammo_name = ammo_name.strip()
+        if ammo_name:
+            names.append(normalize_weapon_name(ammo_name))
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            ammo_name = row.get('ammo type', '').strip()
-            if not ammo_name:
-                continue
-            
-            canonical_name = normalize_weapon_name(ammo_name)
-            
-            # Check if component type already exists
-            existing = session.query(ComponentType).filter(
-                ComponentType.name == canonical_name
-            ).first()
-            if existing:
-                ammo_map[canonical_name] = existing.id
-                print(f"  Found existing ammo: {canonical_name}")
-                continue
-            
-            # Create new component type
-            component = ComponentType(
-                name=canonical_name,
-                category='ammo'
-            )
-            session.add(component)
-            session.flush()
-            ammo_map[canonical_name] = component.id
-            print(f"  Created ammo: {canonical_name} (ID: {component.id})")
+    # Check which component types already exist
+    existing = dict(session.query(ComponentType.name, ComponentType.id).all())
+    ammo_map = {n: existing[n] for n in names if n in existing}
+    if VERBOSE:
+        for canonical_name in dict.fromkeys(n for n in names if n in ammo_map):
+            print(f"  Found existing ammo: {canonical_name}")
+    
+    new_names = [n for n in dict.fromkeys(names) if n not in ammo_map]
+    if new_names:
+        ids = session.execute(
+            insert(ComponentType).returning(ComponentType.id, sort_by_parameter_order=True),
+            [{"name": name, "category": "ammo"} for name in new_names],
+        ).scalars().all()
+        for canonical_name, component_id in zip(new_names, ids):
+            ammo_map[canonical_name] = component_id
+            if VERBOSE:
+                print(f"  Created ammo: {canonical_name} (ID: {component_id})")
+    print(f"  Created {len(new_names)} ammo types ({len(ammo_map) - len(new_names)} already present)")
     
     session.commit()
     return ammo_map
@@ -290,13 +318,11 @@ def load_engine_tonnage(session, csv_path: Path) -> None:
     For now, just validate it loads correctly.
     """
     engine_data = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            engine_no = _parse_int(row.get('engine no'))
-            eng_tons = _parse_float(row.get('eng tons'))
-            if engine_no and eng_tons:
-                engine_data.append((engine_no, eng_tons))
+    for engine_no, eng_tons in _read_columns(csv_path, 'engine no', 'eng tons'):
+        engine_no = _parse_int(engine_no)
+        eng_tons = _parse_float(eng_tons)
+        if engine_no and eng_tons:
+            engine_data.append((engine_no, eng_tons))
     
     print(f"  Loaded {len(engine_data)} engine tonnage entries")
 
@@ -307,7 +333,7 @@ def _parse_int(value) -> int:
         return None
     try:
         # Remove common non-numeric characters
-        cleaned = re.sub(r'[^\d\-]', '', str(value))
+        cleaned = NON_INT_CHARS_RE.sub('', str(value))
         if cleaned:
             return int(cleaned)
     except:
@@ -325,63 +351,74 @@ def _parse_float(value) -> float:
         return None
 
 
-def create_common_aliases(session):
+# Extra aliases for create_common_aliases, based on common MTF file variations:
+# mapping key (looked up as a weapon name) -> aliases
+COMMON_ALIAS_MAPPINGS = {
+    # Autocannons - MTF uses "Autocannon/X" format
+    'autocannon 2': ['ac2', 'ac 2', 'ac/2', 'autocannon/2'],
+    'autocannon 5': ['ac5', 'ac 5', 'ac/5', 'autocannon/5'],
+    'autocannon 10': ['ac10', 'ac 10', 'ac/10', 'autocannon/10'],
+    'autocannon 20': ['ac20', 'ac 20', 'ac/20', 'autocannon/20'],
+    'ultra autocannon 5': ['uac5', 'uac 5', 'ultra ac 5', 'ultra ac/5'],
+    'ultra autocannon 10': ['uac10', 'uac 10', 'ultra ac 10', 'ultra ac/10'],
+    'ultra autocannon 20': ['uac20', 'uac 20', 'ultra ac 20', 'ultra ac/20'],
+    
+    # Lasers - MTF uses "Size Laser" format (e.g., "Large Laser")
+    'laser lg': ['large laser', 'll', 'l laser', 'large las', 'large laser r'],
+    'laser med': ['medium laser', 'ml', 'm laser', 'med laser', 'medium laser r'],
+    'laser sm': ['small laser', 'sl', 's laser', 'small las', 'small laser r'],
+    'laser lg pulse': ['large pulse laser', 'lpl', 'l pulse', 'large pulse'],
+    'laser med pulse': ['medium pulse laser', 'mpl', 'm pulse', 'med pulse'],
+    'laser sm pulse': ['small pulse laser', 'spl', 's pulse', 'small pulse'],
+    'laser er lg': ['er large laser', 'er ll', 'er l laser', 'large laser er'],
+    'laser er med': ['er medium laser', 'er ml', 'er m laser', 'medium laser er'],
+    'laser er sm': ['er small laser', 'er sl', 'er s laser', 'small laser er'],
+    
+    # Missiles - MTF uses "LRM X" or "LRM-X" format
+    'lrm05': ['lrm 5', 'lrm5', 'lrm-5'],
+    'lrm10': ['lrm 10', 'lrm-10'],
+    'lrm15': ['lrm 15', 'lrm-15'],
+    'lrm20': ['lrm 20', 'lrm-20'],
+    'srm2': ['srm 2', 'srm-2', 'srm 2 r'],
+    'srm4': ['srm 4', 'srm-4', 'srm 4 r'],
+    'srm6': ['srm 6', 'srm-6', 'srm 6 r'],
+    
+    # Other common weapons
+    'gauss rifle': ['gauss', 'g rifle'],
+    'machine gun': ['mg', 'm gun'],
+    'particle projection cannon': ['ppc'],
+    'ppc': ['particle projection cannon'],
+    
+    # Rear-facing variants (MTF uses "(R)" suffix) are included above
+    # (merged into the main alias lists so keys do not collide)
+}
+# Size abbreviations create_common_aliases expands when matching mapping keys
+SIZE_ABBREVIATIONS = {'lg': 'large', 'med': 'medium', 'sm': 'small', 'l': 'large', 'm': 'medium', 's': 'small'}
+
+
+def create_common_aliases(session, existing_weapons: Optional[Dict[str, int]] = None,
+                          existing_aliases: Optional[Set[str]] = None):
     """
     Create additional common aliases that might not be auto-generated.
     These are based on common MTF file variations.
+    existing_weapons / existing_aliases: as for load_is_equipment
     """
-    common_mappings = {
-        # Autocannons - MTF uses "Autocannon/X" format
-        'autocannon 2': ['ac2', 'ac 2', 'ac/2', 'autocannon/2'],
-        'autocannon 5': ['ac5', 'ac 5', 'ac/5', 'autocannon/5'],
-        'autocannon 10': ['ac10', 'ac 10', 'ac/10', 'autocannon/10'],
-        'autocannon 20': ['ac20', 'ac 20', 'ac/20', 'autocannon/20'],
-        'ultra autocannon 5': ['uac5', 'uac 5', 'ultra ac 5', 'ultra ac/5'],
-        'ultra autocannon 10': ['uac10', 'uac 10', 'ultra ac 10', 'ultra ac/10'],
-        'ultra autocannon 20': ['uac20', 'uac 20', 'ultra ac 20', 'ultra ac/20'],
-        
-        # Lasers - MTF uses "Size Laser" format (e.g., "Large Laser")
-        'laser lg': ['large laser', 'll', 'l laser', 'large las', 'large laser r'],
-        'laser med': ['medium laser', 'ml', 'm laser', 'med laser', 'medium laser r'],
-        'laser sm': ['small laser', 'sl', 's laser', 'small las', 'small laser r'],
-        'laser lg pulse': ['large pulse laser', 'lpl', 'l pulse', 'large pulse'],
-        'laser med pulse': ['medium pulse laser', 'mpl', 'm pulse', 'med pulse'],
-        'laser sm pulse': ['small pulse laser', 'spl', 's pulse', 'small pulse'],
-        'laser er lg': ['er large laser', 'er ll', 'er l laser', 'large laser er'],
-        'laser er med': ['er medium laser', 'er ml', 'er m laser', 'medium laser er'],
-        'laser er sm': ['er small laser', 'er sl', 'er s laser', 'small laser er'],
-        
-        # Missiles - MTF uses "LRM X" or "LRM-X" format
-        'lrm05': ['lrm 5', 'lrm5', 'lrm-5'],
-        'lrm10': ['lrm 10', 'lrm-10'],
-        'lrm15': ['lrm 15', 'lrm-15'],
-        'lrm20': ['lrm 20', 'lrm-20'],
-        'srm2': ['srm 2', 'srm-2', 'srm 2 r'],
-        'srm4': ['srm 4', 'srm-4', 'srm 4 r'],
-        'srm6': ['srm 6', 'srm-6', 'srm 6 r'],
-        
-        # Other common weapons
-        'gauss rifle': ['gauss', 'g rifle'],
-        'machine gun': ['mg', 'm gun'],
-        'particle projection cannon': ['ppc'],
-        'ppc': ['particle projection cannon'],
-        
-        # Rear-facing variants (MTF uses "(R)" suffix) are included above
-        # (merged into the main alias lists so keys do not collide)
-    }
+    if existing_weapons is None or existing_aliases is None:
+        existing_weapons, existing_aliases = load_weapon_caches(session)
+    alias_rows = []
     
     print("\nCreating common aliases...")
-    for canonical, aliases in common_mappings.items():
+    for canonical, aliases in COMMON_ALIAS_MAPPINGS.items():
         # Find weapon by normalized canonical name (try several fallbacks)
         normalized_canonical = normalize_weapon_name(canonical)
 
-        weapon = session.query(Weapon).filter(Weapon.name == normalized_canonical).first()
+        weapon_id = existing_weapons.get(normalized_canonical)
 
         # If the canonical key doesn't match a DB name (e.g. mapping uses
         # abbreviations like 'laser lg' but DB contains 'large laser') try
         # a set of candidate names generated from the mapping key to find
         # an existing weapon record.
-        if not weapon:
+        if not weapon_id:
             # Candidates include the canonical plus generated aliases for it
             candidates = set()
             candidates.add(normalized_canonical)
@@ -401,24 +438,24 @@ def create_common_aliases(session):
                 a, b = parts
                 candidates.add(f"{b} {a}")
                 # Expand size abbreviations to common words
-                size_map = {'lg': 'large', 'med': 'medium', 'sm': 'small', 'l': 'large', 'm': 'medium', 's': 'small'}
-                if a in size_map:
-                    candidates.add(f"{size_map[a]} {b}")
-                if b in size_map:
-                    candidates.add(f"{a} {size_map[b]}")
+                if a in SIZE_ABBREVIATIONS:
+                    candidates.add(f"{SIZE_ABBREVIATIONS[a]} {b}")
+                if b in SIZE_ABBREVIATIONS:
+                    candidates.add(f"{a} {SIZE_ABBREVIATIONS[b]}")
                     # also try putting the size word first -> 'large laser'
-                    candidates.add(f"{size_map[b]} {a}")
+                    candidates.add(f"{SIZE_ABBREVIATIONS[b]} {a}")
 
             # Look up the first matching candidate in DB
             for cand in candidates:
                 if not cand:
                     continue
-                weapon = session.query(Weapon).filter(Weapon.name == cand).first()
-                if weapon:
-                    print(f"  Found weapon for mapping '{canonical}' using candidate: {cand}")
+                weapon_id = existing_weapons.get(cand)
+                if weapon_id:
+                    if VERBOSE:
+                        print(f"  Found weapon for mapping '{canonical}' using candidate: {cand}")
                     break
 
-        if not weapon:
+        if not weapon_id:
             print(f"  Warning: Weapon not found: {normalized_canonical}")
             continue
         
@@ -427,19 +464,16 @@ def create_common_aliases(session):
             if normalized_alias == normalized_canonical:
                 continue
             
-            existing = session.query(WeaponAlias).filter(
-                WeaponAlias.alias == normalized_alias
-            ).first()
-            if existing:
+            if normalized_alias in existing_aliases:
                 continue
             
-            try:
-                wa = WeaponAlias(alias=normalized_alias, weapon_id=weapon.id)
-                session.add(wa)
+            existing_aliases.add(normalized_alias)
+            alias_rows.append({"alias": normalized_alias, "weapon_id": weapon_id})
+            if VERBOSE:
                 print(f"  Added: {normalized_alias} -> {normalized_canonical}")
-            except IntegrityError:
-                session.rollback()
     
+    bulk_insert_ignore(session, WeaponAlias, alias_rows)
+    print(f"  Added {len(alias_rows)} common aliases")
     session.commit()
 
 
@@ -476,8 +510,15 @@ def main():
         action='store_true',
         help='Use PostgreSQL instead of SQLite'
     )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print every weapon, alias and ammo type as it is created'
+    )
     
     args = parser.parse_args()
+    global VERBOSE
+    VERBOSE = args.verbose
     
     # Get database connection
     use_postgres = USE_POSTGRES or args.use_postgres
@@ -485,14 +526,16 @@ def main():
     print(f"Connecting to: {engine.url}")
     
     # Ensure tables exist
-    Base.metadata.create_all(bind=engine)
+    initialize_db(engine)
     session = Session()
+    # Fetched once and kept current by each loader
+    existing_weapons, existing_aliases = load_weapon_caches(session)
     
     # Load Inner Sphere equipment
     is_csv = Path(args.equipment_csv)
     if is_csv.exists():
         print(f"\nLoading Inner Sphere equipment from {is_csv}...")
-        is_weapons = load_is_equipment(session, is_csv)
+        is_weapons = load_is_equipment(session, is_csv, existing_weapons, existing_aliases)
         print(f"Loaded {len(is_weapons)} IS weapons")
     else:
         print(f"Warning: {is_csv} not found, skipping IS equipment")
@@ -501,7 +544,7 @@ def main():
     clan_csv = Path(args.clan_csv)
     if clan_csv.exists():
         print(f"\nLoading Clan equipment from {clan_csv}...")
-        clan_weapons = load_clan_equipment(session, clan_csv)
+        clan_weapons = load_clan_equipment(session, clan_csv, existing_weapons, existing_aliases)
         print(f"Loaded {len(clan_weapons)} Clan weapons")
     else:
         print(f"Warning: {clan_csv} not found, skipping Clan equipment")
@@ -524,7 +567,7 @@ def main():
         print(f"Warning: {engine_csv} not found, skipping engine data")
     
     # Create additional common aliases
-    create_common_aliases(session)
+    create_common_aliases(session, existing_weapons, existing_aliases)
     
     # Summary
     print("\n" + "="*60)
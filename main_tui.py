@@ -8,11 +8,14 @@ Handles mechs, vehicles, aerospace, battle armor, infantry, and weapons.
 
 import os
 import sys
+import argparse
 import random
 import subprocess
 from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 
 import mtf_ingest  # for adjusting SQLite path
 
@@ -26,26 +29,29 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
 from rich.text import Text
 
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, literal, select, text
 from sqlalchemy.orm import Session
 
 # Import from existing modules
 from mtf_ingest import (
-    get_engine_and_session, Mech, Location, Slot, WeaponInstance,
-    StagingSlot, StagingUnresolved, Weapon, WeaponAlias, Manufacturer, Factory,
-    parse_mtf_text, ingest_parsed_mech, resolve_staging, finalize_slots_from_staging,
-    USE_POSTGRES, POSTGRES_DSN, Base, SQLITE_FILENAME, BV_PV_MODE_DEFAULT
+    get_engine_and_session, initialize_db, Mech, Location, Slot, WeaponInstance,
+    StagingSlot, StagingUnresolved, Weapon, WeaponAlias, Manufacturer, Factory, IngestManifest,
+    parse_mtf_text, parse_mtf_file, read_unit_file, ingest_parsed_mech, resolve_staging, finalize_slots_from_staging,
+    refresh_stats_view, notify_api_reload,
+    USE_POSTGRES, POSTGRES_DSN, SQLITE_FILENAME, BV_PV_MODE_DEFAULT
 )
 
 from blk_ingest import (
     Vehicle, VehicleLocation, VehicleSlot, VehicleWeaponInstance,
     StagingVehicleSlot, VehicleArmor,
-    parse_blk_text, ingest_parsed_vehicle, resolve_vehicle_staging, finalize_vehicle_slots
+    parse_blk_text, parse_blk_file, ingest_parsed_vehicle, resolve_vehicle_staging, finalize_vehicle_slots,
+    file_digest, record_manifest, load_name_caches,
+    ParsedVehicle, COMMIT_EVERY_FILES, PARALLEL_PARSE_MIN_FILES, PARSE_CHUNKSIZE
 )
 
 from load_equipment_csv import (
     load_is_equipment, load_clan_equipment, load_ammo, 
-    load_engine_tonnage, create_common_aliases
+    load_engine_tonnage, create_common_aliases, load_weapon_caches
 )
 
 console = Console()
@@ -64,6 +70,20 @@ FOLDERS = {
 # Point SQLite to repo root so location is consistent even if launched elsewhere
 SQLITE_PATH = ROOT_DIR / Path(mtf_ingest.SQLITE_FILENAME).name
 mtf_ingest.SQLITE_FILENAME = str(SQLITE_PATH)
+# The status screen shows Postgres planner row estimates for these big tables
+# instead of COUNT(*) unless EXACT_COUNTS is set (--exact)
+ESTIMATED_COUNT_MODELS = (Mech, Vehicle, WeaponAlias)
+EXACT_COUNTS = False
+# Wait for Enter after each action; off with --no-pause or when stdin isn't a
+# terminal, so scripted runs don't stall between menu choices
+PAUSE_AFTER_ACTIONS = True
+
+# Last get_database_status result; ingest/resolve/finalize/load actions mark it
+# dirty so menu redraws in between don't re-run the counts
+STATUS_CACHE = {"key": None, "data": None, "dirty": True}
+
+# Threads reading/parsing ahead of the DB writes for folders too small for the process pool
+PREFETCH_WORKERS = 4
 
 def format_db_label(use_postgres: bool) -> str:
     """Return human-readable database label"""
@@ -81,42 +101,101 @@ def dispose_engine(engine):
 def init_session(use_postgres: bool):
     """Create engine, session factory, and session"""
     engine, SessionLocal = get_engine_and_session(use_postgres)
-    Base.metadata.create_all(bind=engine)
+    initialize_db(engine)
     return engine, SessionLocal, SessionLocal()
 
 # ============================================================================
 # Database Status Functions
 # ============================================================================
 
-def get_database_status(session: Session) -> Dict:
-    """Get comprehensive database statistics"""
+def _count(model, *criteria):
+    """Scalar subquery counting rows of model matching criteria"""
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+def estimated_row_counts(session: Session, table_names) -> Dict[str, int]:
+    """
+    Row counts from Postgres planner statistics (pg_class.reltuples), which
+    autovacuum keeps current. Other databases get exact counts: nothing
+    refreshes SQLite's sqlite_stat1, and STATUS_CACHE already limits the
+    COUNT(*)s to once per write. Tables without statistics are left out.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return {}
+    rows = session.execute(text(
+        "SELECT relname, reltuples::bigint FROM pg_class "
+        "WHERE relkind = 'r' AND pg_table_is_visible(oid) AND relname IN :names"
+    ).bindparams(bindparam("names", expanding=True)), {"names": list(table_names)})
+    # reltuples is -1 for tables that were never analyzed
+    return {name: count for name, count in rows if count >= 0}
+
+def invalidate_status_cache():
+    """Force the next get_database_status call to query the database"""
+    STATUS_CACHE["dirty"] = True
+
+def get_database_status(session: Session, exact: Optional[bool] = None) -> Dict:
+    """
+    Get comprehensive database statistics
+    exact: COUNT(*) every table; by default (EXACT_COUNTS off) the totals of
+    ESTIMATED_COUNT_MODELS come from estimated_row_counts where available.
+    Non-exact calls reuse the cached result until invalidate_status_cache()
+    """
+    if exact is None:
+        exact = EXACT_COUNTS
+    cache_key = str(session.get_bind().url)
+    if (not exact and not STATUS_CACHE["dirty"]
+            and STATUS_CACHE["key"] == cache_key):
+        return STATUS_CACHE["data"]
+    estimates = {} if exact else estimated_row_counts(
+        session, (model.__tablename__ for model in ESTIMATED_COUNT_MODELS)
+    )
+
+    def total(model):
+        estimate = estimates.get(model.__tablename__)
+        return _count(model) if estimate is None else literal(estimate)
+
+    # All counts come back in one round-trip as scalar subqueries; nothing
+    # here needs pending ORM changes, so skip the autoflush check
+    with session.no_autoflush:
+        counts = session.execute(select(
+            total(Mech).label("mechs"),
+            _count(StagingSlot).label("mech_staging"),
+            _count(StagingSlot, StagingSlot.resolved == True).label("mech_staging_resolved"),
+            _count(Slot).label("mech_slots"),
+            _count(WeaponInstance).label("mech_weapon_instances"),
+            total(Vehicle).label("vehicles"),
+            _count(StagingVehicleSlot).label("vehicle_staging"),
+            _count(StagingVehicleSlot, StagingVehicleSlot.resolved == True).label("vehicle_staging_resolved"),
+            _count(VehicleSlot).label("vehicle_slots"),
+            _count(VehicleWeaponInstance).label("vehicle_weapon_instances"),
+            _count(Weapon).label("weapons"),
+            total(WeaponAlias).label("aliases"),
+            _count(Manufacturer).label("manufacturers"),
+            _count(Factory).label("factories"),
+            _count(StagingUnresolved).label("unresolved_tokens"),
+        )).one()
     status = {
         "mechs": {
-            "total": session.query(Mech).count(),
-            "staging": session.query(StagingSlot).count(),
-            "staging_resolved": session.query(StagingSlot).filter(
-                StagingSlot.resolved == True
-            ).count(),
-            "finalized_slots": session.query(Slot).count(),
-            "weapon_instances": session.query(WeaponInstance).count(),
+            "total": counts.mechs,
+            "staging": counts.mech_staging,
+            "staging_resolved": counts.mech_staging_resolved,
+            "finalized_slots": counts.mech_slots,
+            "weapon_instances": counts.mech_weapon_instances,
         },
         "vehicles": {
-            "total": session.query(Vehicle).count(),
-            "staging": session.query(StagingVehicleSlot).count(),
-            "staging_resolved": session.query(StagingVehicleSlot).filter(
-                StagingVehicleSlot.resolved == True
-            ).count(),
-            "finalized_slots": session.query(VehicleSlot).count(),
-            "weapon_instances": session.query(VehicleWeaponInstance).count(),
+            "total": counts.vehicles,
+            "staging": counts.vehicle_staging,
+            "staging_resolved": counts.vehicle_staging_resolved,
+            "finalized_slots": counts.vehicle_slots,
+            "weapon_instances": counts.vehicle_weapon_instances,
         },
         "weapons": {
-            "total": session.query(Weapon).count(),
-            "aliases": session.query(WeaponAlias).count(),
+            "total": counts.weapons,
+            "aliases": counts.aliases,
         },
         "shared": {
-            "manufacturers": session.query(Manufacturer).count(),
-            "factories": session.query(Factory).count(),
-            "unresolved_tokens": session.query(StagingUnresolved).count(),
+            "manufacturers": counts.manufacturers,
+            "factories": counts.factories,
+            "unresolved_tokens": counts.unresolved_tokens,
         }
     }
     
@@ -143,6 +222,7 @@ def get_database_status(session: Session) -> Dict:
     else:
         status["vehicles"]["resolution_rate"] = 0
     
+    STATUS_CACHE.update(key=cache_key, data=status, dirty=False)
     return status
 
 def get_top_unresolved(session: Session, limit: int = 10) -> List[Tuple]:
@@ -155,28 +235,51 @@ def get_top_unresolved(session: Session, limit: int = 10) -> List[Tuple]:
         StagingUnresolved.seen_count.desc()
     ).limit(limit).all()
 
-def get_pending_files(folder: Path, extension: str) -> List[Path]:
-    """Get list of files ready for ingestion"""
-    if not folder.exists():
+@lru_cache(maxsize=32)
+def _scan_folder(folder: str, extensions: Tuple[str, ...], mtime_ns: int) -> Tuple[Path, ...]:
+    """
+    One os.scandir pass over folder, sorted per extension in the order given.
+    mtime_ns is only part of the cache key: adding or removing a file changes
+    the folder's mtime, so a stale listing is never returned.
+    """
+    by_ext: Dict[str, List[str]] = {ext: [] for ext in extensions}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            # Same matches as Path.glob("*.ext")
+            _, dot, ext = entry.name.rpartition(".")
+            if dot and ext in by_ext:
+                by_ext[ext].append(entry.name)
+    base = Path(folder)
+    return tuple(base / name for ext in extensions for name in sorted(by_ext[ext]))
+
+def get_pending_files(folder: Path, *extensions: str) -> List[Path]:
+    """Get list of files ready for ingestion with any of the given extensions"""
+    try:
+        mtime_ns = folder.stat().st_mtime_ns
+    except FileNotFoundError:
         return []
-    return sorted(folder.glob(f"*.{extension}"))
+    return list(_scan_folder(str(folder), extensions, mtime_ns))
 
 # ============================================================================
 # Display Functions
 # ============================================================================
 
-def display_header(db_label: Optional[str] = None):
-    """Display application header"""
-    console.clear()
+@lru_cache(maxsize=None)
+def _header_panel(db_label: Optional[str]) -> Panel:
+    """Header panel per database label; markup is parsed once"""
     subtitle = "[dim]Unified management for mechs, vehicles, and equipment[/dim]"
     if db_label:
         subtitle += f"\n[dim]Database: {db_label}[/dim]"
-    header = Panel(
-        "[bold cyan]⚔️  BattleTech Database Manager[/bold cyan]\n" + subtitle,
+    return Panel(
+        Text.from_markup("[bold cyan]⚔️  BattleTech Database Manager[/bold cyan]\n" + subtitle),
         box=box.DOUBLE,
         border_style="cyan"
     )
-    console.print(header)
+
+def display_header(db_label: Optional[str] = None):
+    """Display application header"""
+    console.clear()
+    console.print(_header_panel(db_label))
     console.print()
 
 def display_status(status: Dict):
@@ -241,75 +344,80 @@ def display_status(status: Dict):
     console.print(Columns([mech_table, vehicle_table, shared_table], equal=True, expand=True))
     console.print()
 
+def _menu_panel(markup: str) -> Panel:
+    """Rounded cyan menu panel with markup parsed up front"""
+    return Panel(Text.from_markup(markup), box=box.ROUNDED, border_style="cyan")
+
+# Menu text never changes, so the panels are built (and markup parsed) once
+MAIN_MENU_PANEL = _menu_panel(
+    "[bold]Main Menu[/bold]\n\n"
+    "[cyan]1.[/cyan] Ingestion & Processing\n"
+    "[cyan]2.[/cyan] Data / Database\n"
+    "[cyan]3.[/cyan] Utilities\n"
+    "[cyan]0.[/cyan] Exit"
+)
+
+INGEST_MENU_PANEL = _menu_panel(
+    "[bold]Select Data Type to Ingest[/bold]\n\n"
+    "[cyan]1.[/cyan] Mechs (MTF files)\n"
+    "[cyan]2.[/cyan] Vehicles (BLK files)\n"
+    "[cyan]3.[/cyan] Aerospace (BLK files)\n"
+    "[cyan]4.[/cyan] Battle Armor (BLK files)\n"
+    "[cyan]5.[/cyan] Infantry (BLK files)\n"
+    "[cyan]6.[/cyan] All BLK files (vehicles + aerospace + battle armor + infantry)\n"
+    "[cyan]0.[/cyan] Back to previous menu"
+)
+
+PROCESSING_MENU_PANEL = _menu_panel(
+    "[bold]Ingestion & Processing[/bold]\n\n"
+    "[cyan]1.[/cyan] Ingest Data (MTF/BLK)\n"
+    "[cyan]2.[/cyan] Resolve Staging (Match Weapons)\n"
+    "[cyan]3.[/cyan] Finalize Pending Transactions\n"
+    "[cyan]4.[/cyan] Test Random File Pipeline (choose BV/PV mode)\n"
+    "[cyan]0.[/cyan] Back"
+)
+
+DATA_MENU_PANEL = _menu_panel(
+    "[bold]Data / Database[/bold]\n\n"
+    "[cyan]1.[/cyan] Load Weapons/Equipment CSVs\n"
+    "[cyan]2.[/cyan] View Unresolved Weapons\n"
+    "[cyan]3.[/cyan] Database Status\n"
+    "[cyan]4.[/cyan] Rebuild Local SQLite (delete file)\n"
+    "[cyan]5.[/cyan] Switch to Postgres for this session\n"
+    "[cyan]0.[/cyan] Back"
+)
+
+UTILITIES_MENU_PANEL = _menu_panel(
+    "[bold]Utilities[/bold]\n\n"
+    "[cyan]1.[/cyan] Run BV/PV Worker (queue consumer)\n"
+    "[cyan]2.[/cyan] Start API Server\n"
+    "[cyan]0.[/cyan] Back"
+)
+
+def pause():
+    """Hold an action's output on screen until Enter (see PAUSE_AFTER_ACTIONS)"""
+    if PAUSE_AFTER_ACTIONS:
+        Prompt.ask("\nPress Enter to continue")
+
 def display_main_menu_grouped():
     """Display grouped main menu options"""
-    menu = Panel(
-        "[bold]Main Menu[/bold]\n\n"
-        "[cyan]1.[/cyan] Ingestion & Processing\n"
-        "[cyan]2.[/cyan] Data / Database\n"
-        "[cyan]3.[/cyan] Utilities\n"
-        "[cyan]0.[/cyan] Exit",
-        box=box.ROUNDED,
-        border_style="cyan"
-    )
-    console.print(menu)
+    console.print(MAIN_MENU_PANEL)
 
 def display_ingest_menu():
     """Display ingestion submenu"""
-    menu = Panel(
-        "[bold]Select Data Type to Ingest[/bold]\n\n"
-        "[cyan]1.[/cyan] Mechs (MTF files)\n"
-        "[cyan]2.[/cyan] Vehicles (BLK files)\n"
-        "[cyan]3.[/cyan] Aerospace (BLK files)\n"
-        "[cyan]4.[/cyan] Battle Armor (BLK files)\n"
-        "[cyan]5.[/cyan] Infantry (BLK files)\n"
-        "[cyan]6.[/cyan] All BLK files (vehicles + aerospace + battle armor + infantry)\n"
-        "[cyan]0.[/cyan] Back to previous menu",
-        box=box.ROUNDED,
-        border_style="cyan"
-    )
-    console.print(menu)
+    console.print(INGEST_MENU_PANEL)
 
 def display_processing_menu():
     """Display processing submenu"""
-    menu = Panel(
-        "[bold]Ingestion & Processing[/bold]\n\n"
-        "[cyan]1.[/cyan] Ingest Data (MTF/BLK)\n"
-        "[cyan]2.[/cyan] Resolve Staging (Match Weapons)\n"
-        "[cyan]3.[/cyan] Finalize Pending Transactions\n"
-        "[cyan]4.[/cyan] Test Random File Pipeline (choose BV/PV mode)\n"
-        "[cyan]0.[/cyan] Back",
-        box=box.ROUNDED,
-        border_style="cyan"
-    )
-    console.print(menu)
+    console.print(PROCESSING_MENU_PANEL)
 
 def display_data_menu():
     """Display data/database submenu"""
-    menu = Panel(
-        "[bold]Data / Database[/bold]\n\n"
-        "[cyan]1.[/cyan] Load Weapons/Equipment CSVs\n"
-        "[cyan]2.[/cyan] View Unresolved Weapons\n"
-        "[cyan]3.[/cyan] Database Status\n"
-        "[cyan]4.[/cyan] Rebuild Local SQLite (delete file)\n"
-        "[cyan]5.[/cyan] Switch to Postgres for this session\n"
-        "[cyan]0.[/cyan] Back",
-        box=box.ROUNDED,
-        border_style="cyan"
-    )
-    console.print(menu)
+    console.print(DATA_MENU_PANEL)
 
 def display_utilities_menu():
     """Display utilities submenu"""
-    menu = Panel(
-        "[bold]Utilities[/bold]\n\n"
-        "[cyan]1.[/cyan] Run BV/PV Worker (queue consumer)\n"
-        "[cyan]2.[/cyan] Start API Server\n"
-        "[cyan]0.[/cyan] Back",
-        box=box.ROUNDED,
-        border_style="cyan"
-    )
-    console.print(menu)
+    console.print(UTILITIES_MENU_PANEL)
 
 def display_unresolved(session: Session, limit: int = 20):
     """Display unresolved weapon tokens"""
@@ -345,19 +453,46 @@ def display_unresolved(session: Session, limit: int = 20):
 # Action Functions
 # ============================================================================
 
+def parse_files(parse_file, files: List[Path]) -> Iterator[Tuple]:
+    """
+    Yield parse_file(path) for each file, in order. Large folders are parsed
+    in a process pool so only the DB writes run in this process; small ones
+    are read ahead on a few threads so disk reads overlap the DB writes.
+    """
+    if len(files) < PARALLEL_PARSE_MIN_FILES:
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            yield from executor.map(parse_file, files)
+        return
+    with ProcessPoolExecutor() as executor:
+        yield from executor.map(parse_file, files, chunksize=PARSE_CHUNKSIZE)
+
+def filter_unchanged(session: Session, files: List[Path]) -> Tuple[List[Path], Dict[Path, Optional[str]], Dict[str, str]]:
+    """
+    Drop files whose content hash matches their ingest_manifest row.
+    Returns (changed files, path -> digest, prefetched file_name -> sha manifest)
+    """
+    manifest = dict(session.query(IngestManifest.file_name, IngestManifest.sha))
+    digests = {f: file_digest(f) for f in files}
+    changed = [f for f in files if digests[f] is None or manifest.get(f.name) != digests[f]]
+    if len(changed) < len(files):
+        console.print(f"[dim]Skipping {len(files) - len(changed)} unchanged files[/dim]")
+    return changed, digests, manifest
+
 def ingest_mtf_files(session: Session, folder: Path) -> Tuple[int, int]:
     """Ingest MTF files from folder"""
+    invalidate_status_cache()
     if not folder.exists():
         console.print(f"[red]✗ Folder not found: {folder}[/red]")
         return 0, 0
     
-    files = get_pending_files(folder, "mtf") + get_pending_files(folder, "MTF")
+    files = get_pending_files(folder, "mtf", "MTF")
     
     if not files:
         console.print(f"[yellow]⚠ No MTF files found in {folder}[/yellow]")
         return 0, 0
     
     console.print(f"[cyan]Found {len(files)} MTF files[/cyan]")
+    files, digests, manifest = filter_unchanged(session, files)
     
     ingested = 0
     staging_created = 0
@@ -369,35 +504,52 @@ def ingest_mtf_files(session: Session, folder: Path) -> Tuple[int, int]:
     ) as progress:
         task = progress.add_task("Ingesting MTF files...", total=len(files))
         
-        for file_path in files:
+        uncommitted = 0
+        for path, (file_name, parsed, error) in zip(files, parse_files(parse_mtf_file, files)):
+            if error:
+                console.print(f"[red]✗ {error}[/red]")
+                continue
             try:
-                text = file_path.read_text(encoding="utf-8")
-                parsed = parse_mtf_text(text)
-                mech_id, staging_ids = ingest_parsed_mech(session, parsed, str(file_path.name))
-                session.commit()
-                ingested += 1
-                staging_created += len(staging_ids)
-                progress.update(task, advance=1)
+                # A failing file only rolls back its own savepoint. The ingest
+                # functions flush explicitly where they need ids, so queries
+                # don't autoflush; the rest goes out when the savepoint closes
+                with session.begin_nested(), session.no_autoflush:
+                    mech_id, staging_ids = ingest_parsed_mech(session, parsed, file_name)
+                    record_manifest(session, manifest, file_name, digests[path])
+                if digests[path] is not None:
+                    manifest[file_name] = digests[path]
             except Exception as e:
-                session.rollback()
-                console.print(f"[red]✗ Failed to ingest {file_path.name}: {e}[/red]")
+                console.print(f"[red]✗ Failed to ingest {file_name}: {e}[/red]")
+                continue
+            ingested += 1
+            staging_created += len(staging_ids)
+            progress.update(task, advance=1)
+            uncommitted += 1
+            if uncommitted >= COMMIT_EVERY_FILES:
+                session.commit()
+                uncommitted = 0
+        session.commit()
     
     console.print(f"[green]✓ Ingested {ingested} mechs, created {staging_created} staging slots[/green]")
+    refresh_stats_view(session.get_bind())
+    notify_api_reload()
     return ingested, staging_created
 
 def ingest_blk_files(session: Session, folder: Path, unit_type: str = None) -> Tuple[int, int]:
     """Ingest BLK files from folder"""
+    invalidate_status_cache()
     if not folder.exists():
         console.print(f"[red]✗ Folder not found: {folder}[/red]")
         return 0, 0
     
-    files = get_pending_files(folder, "blk") + get_pending_files(folder, "BLK")
+    files = get_pending_files(folder, "blk", "BLK")
     
     if not files:
         console.print(f"[yellow]⚠ No BLK files found in {folder}[/yellow]")
         return 0, 0
     
     console.print(f"[cyan]Found {len(files)} BLK files[/cyan]")
+    files, digests, manifest = filter_unchanged(session, files)
     
     ingested = 0
     staging_created = 0
@@ -409,24 +561,45 @@ def ingest_blk_files(session: Session, folder: Path, unit_type: str = None) -> T
     ) as progress:
         task = progress.add_task(f"Ingesting {unit_type or 'BLK'} files...", total=len(files))
         
-        for file_path in files:
+        uncommitted = 0
+        name_caches = load_name_caches(session)
+        for path, (file_name, data, error) in zip(files, parse_files(parse_blk_file, files)):
+            if error:
+                console.print(f"[red]✗ {error}[/red]")
+                continue
             try:
-                text = file_path.read_text(encoding="utf-8")
-                parsed = parse_blk_text(text)
-                vehicle_id, staging_ids = ingest_parsed_vehicle(session, parsed, str(file_path.name))
-                session.commit()
-                ingested += 1
-                staging_created += len(staging_ids)
-                progress.update(task, advance=1)
+                # A failing file only rolls back its own savepoint. The ingest
+                # functions flush explicitly where they need ids, so queries
+                # don't autoflush; the rest goes out when the savepoint closes
+                with session.begin_nested(), session.no_autoflush:
+                    vehicle_id, staging_ids = ingest_parsed_vehicle(
+                        session, ParsedVehicle(**data), file_name, name_caches=name_caches
+                    )
+                    record_manifest(session, manifest, file_name, digests[path])
+                if digests[path] is not None:
+                    manifest[file_name] = digests[path]
             except Exception as e:
-                session.rollback()
-                console.print(f"[red]✗ Failed to ingest {file_path.name}: {e}[/red]")
+                # Names inserted in the rolled-back savepoint are gone again
+                name_caches = load_name_caches(session)
+                console.print(f"[red]✗ Failed to ingest {file_name}: {e}[/red]")
+                continue
+            ingested += 1
+            staging_created += len(staging_ids)
+            progress.update(task, advance=1)
+            uncommitted += 1
+            if uncommitted >= COMMIT_EVERY_FILES:
+                session.commit()
+                uncommitted = 0
+        session.commit()
     
     console.print(f"[green]✓ Ingested {ingested} units, created {staging_created} staging slots[/green]")
+    refresh_stats_view(session.get_bind())
+    notify_api_reload()
     return ingested, staging_created
 
 def resolve_all_staging(session: Session):
     """Resolve both mech and vehicle staging"""
+    invalidate_status_cache()
     console.print("[cyan]Resolving mech staging...[/cyan]")
     mech_resolved, mech_unresolved = resolve_staging(session)
     session.commit()
@@ -454,6 +627,7 @@ def resolve_all_staging(session: Session):
 
 def finalize_all_pending(session: Session):
     """Finalize all pending transactions"""
+    invalidate_status_cache()
     console.print("[cyan]Finalizing mech slots...[/cyan]")
     mech_slots, mech_weapons = finalize_slots_from_staging(session)
     session.commit()
@@ -478,9 +652,12 @@ def finalize_all_pending(session: Session):
         f"[bold green]Total: {total_slots} slots finalized, "
         f"{total_weapons} weapon instances created[/bold green]"
     )
+    refresh_stats_view(session.get_bind())
+    notify_api_reload()
 
 def rebuild_sqlite_database(session: Session, engine) -> Tuple:
     """Delete local SQLite file and recreate schema"""
+    invalidate_status_cache()
     session.close()
     dispose_engine(engine)
     sqlite_path = SQLITE_PATH
@@ -507,9 +684,14 @@ def switch_to_postgres(session: Session, engine) -> Tuple:
     console.print(f"[green]✓ Switched to Postgres DSN:[/green] {POSTGRES_DSN}")
     return new_engine, SessionLocal, new_session
 
-def ingest_single_file(session: Session, category: str, file_path: Path, bv_pv_mode: str = BV_PV_MODE_DEFAULT) -> Tuple[int, int]:
-    """Ingest a single file based on category"""
-    text = file_path.read_text(encoding="utf-8")
+def ingest_single_file(session: Session, category: str, file_path: Path, bv_pv_mode: str = BV_PV_MODE_DEFAULT,
+                       commit: bool = True) -> Tuple[int, int]:
+    """
+    Ingest a single file based on category.
+    commit=False only flushes, leaving the commit to a caller batching files
+    """
+    invalidate_status_cache()
+    text = read_unit_file(file_path)
     
     if category == "mechs":
         parsed = parse_mtf_text(text)
@@ -518,7 +700,10 @@ def ingest_single_file(session: Session, category: str, file_path: Path, bv_pv_m
         parsed = parse_blk_text(text)
         _, staging_ids = ingest_parsed_vehicle(session, parsed, str(file_path.name), bv_pv_mode=bv_pv_mode)
     
-    session.commit()
+    if commit:
+        session.commit()
+    else:
+        session.flush()
     return 1, len(staging_ids)
 
 def collect_test_candidates() -> List[Tuple[str, Path]]:
@@ -529,9 +714,8 @@ def collect_test_candidates() -> List[Tuple[str, Path]]:
         if not folder.exists():
             continue
         
-        exts = ["mtf", "MTF"] if name == "mechs" else ["blk", "BLK"]
-        for ext in exts:
-            candidates.extend([(name, path) for path in folder.glob(f"*.{ext}")])
+        exts = ("mtf", "MTF") if name == "mechs" else ("blk", "BLK")
+        candidates.extend((name, path) for path in get_pending_files(folder, *exts))
     
     return candidates
 
@@ -548,7 +732,7 @@ def run_test_state(session: Session, bv_pv_mode: str = BV_PV_MODE_DEFAULT):
     console.print(f"[cyan]Selected {category} file:[/cyan] {file_path}")
     console.print(f"[cyan]BV/PV mode:[/cyan] {bv_pv_mode}")
     
-    status_before = get_database_status(session)
+    status_before = get_database_status(session, exact=True)
     
     try:
         ingested, staging_created = ingest_single_file(session, category, file_path, bv_pv_mode=bv_pv_mode)
@@ -584,7 +768,7 @@ def run_test_state(session: Session, bv_pv_mode: str = BV_PV_MODE_DEFAULT):
         console.print(f"[red]✗ Finalization failed: {exc}[/red]")
         return
     
-    status_after = get_database_status(session)
+    status_after = get_database_status(session, exact=True)
     unresolved_delta = (
         status_after["shared"]["unresolved_tokens"] - status_before["shared"]["unresolved_tokens"]
     )
@@ -601,6 +785,7 @@ def run_test_state(session: Session, bv_pv_mode: str = BV_PV_MODE_DEFAULT):
 
 def load_all_weapons(session: Session):
     """Load weapons and equipment from CSVs"""
+    invalidate_status_cache()
     weapons_folder = FOLDERS["weapons"]
     
     if not weapons_folder.exists():
@@ -637,16 +822,19 @@ def load_all_weapons(session: Session):
         console=console
     ) as progress:
         task = progress.add_task("Loading weapons...", total=len(found_files))
+        existing_weapons, existing_aliases = load_weapon_caches(session)
         
         if "is_equipment" in found_files:
             console.print("[cyan]Loading Inner Sphere equipment...[/cyan]")
-            weapons = load_is_equipment(session, found_files["is_equipment"])
+            weapons = load_is_equipment(session, found_files["is_equipment"],
+                                        existing_weapons, existing_aliases)
             console.print(f"[green]✓ Loaded {len(weapons)} IS weapons[/green]")
             progress.update(task, advance=1)
         
         if "clan_equipment" in found_files:
             console.print("[cyan]Loading Clan equipment...[/cyan]")
-            weapons = load_clan_equipment(session, found_files["clan_equipment"])
+            weapons = load_clan_equipment(session, found_files["clan_equipment"],
+                                          existing_weapons, existing_aliases)
             console.print(f"[green]✓ Loaded {len(weapons)} Clan weapons[/green]")
             progress.update(task, advance=1)
         
@@ -663,7 +851,7 @@ def load_all_weapons(session: Session):
             progress.update(task, advance=1)
     
     console.print("[cyan]Creating common weapon aliases...[/cyan]")
-    create_common_aliases(session)
+    create_common_aliases(session, existing_weapons, existing_aliases)
     console.print("[green]✓ Created common aliases[/green]")
     
     console.print()
@@ -700,16 +888,28 @@ def run_bv_pv_worker(use_postgres: bool, loop: bool = False, limit: int = 10, sl
         cmd.append("--use-postgres")
     
     console.print(f"[cyan]Running BV/PV worker ({'looping' if loop else 'one-shot'})...[/cyan]")
+    # Stream output as it arrives so --loop runs show progress and don't
+    # accumulate everything in memory
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.stdout:
-            console.print(result.stdout.strip())
-        else:
-            console.print("[dim]No output[/dim]")
-        if result.stderr:
-            console.print(f"[red]{result.stderr.strip()}[/red]")
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
     except Exception as exc:
         console.print(f"[red]✗ Failed to run worker: {exc}[/red]")
+        return
+    printed = False
+    try:
+        for line in proc.stdout:
+            console.print(line.rstrip("\n"), markup=False, highlight=False)
+            printed = True
+        if not printed:
+            console.print("[dim]No output[/dim]")
+        if proc.wait():
+            console.print(f"[red]✗ Worker exited with status {proc.returncode}[/red]")
+    except KeyboardInterrupt:
+        proc.terminate()
+        proc.wait()
+        console.print("\n[yellow]Worker stopped[/yellow]")
+    finally:
+        proc.stdout.close()
 
 # ============================================================================
 # Main Menu Handlers
@@ -732,30 +932,30 @@ def handle_ingest_menu(session: Session, db_label: Optional[str] = None):
         elif choice == "1":
             console.print("\n[bold cyan]Ingesting Mechs (MTF)[/bold cyan]")
             ingest_mtf_files(session, FOLDERS["mechs"])
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "2":
             console.print("\n[bold cyan]Ingesting Vehicles (BLK)[/bold cyan]")
             ingest_blk_files(session, FOLDERS["vehicles"], "vehicles")
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "3":
             console.print("\n[bold cyan]Ingesting Aerospace (BLK)[/bold cyan]")
             ingest_blk_files(session, FOLDERS["aerospace"], "aerospace")
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "4":
             console.print("\n[bold cyan]Ingesting Battle Armor (BLK)[/bold cyan]")
             ingest_blk_files(session, FOLDERS["battlearmor"], "battle armor")
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "5":
             console.print("\n[bold cyan]Ingesting Infantry (BLK)[/bold cyan]")
             ingest_blk_files(session, FOLDERS["infantry"], "infantry")
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "6":
             console.print("\n[bold cyan]Ingesting All BLK Files[/bold cyan]")
             for folder_name, folder_path in FOLDERS.items():
                 if folder_name in ["vehicles", "aerospace", "battlearmor", "infantry"]:
                     console.print(f"\n[cyan]Processing {folder_name}...[/cyan]")
                     ingest_blk_files(session, folder_path, folder_name)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
 
 def handle_processing_menu(session: Session, use_postgres: bool):
     """Handle ingestion and processing actions"""
@@ -776,7 +976,7 @@ def handle_processing_menu(session: Session, use_postgres: bool):
         elif choice == "2":
             console.print("\n[bold cyan]Resolving Staging[/bold cyan]")
             resolve_all_staging(session)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "3":
             console.print("\n[bold cyan]Finalizing Pending Transactions[/bold cyan]")
             status = get_database_status(session)
@@ -784,7 +984,7 @@ def handle_processing_menu(session: Session, use_postgres: bool):
                 console.print("[yellow]No pending transactions to finalize[/yellow]")
             elif Confirm.ask("\nFinalize all pending transactions?"):
                 finalize_all_pending(session)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "4":
             mode_choice = Prompt.ask(
                 "BV/PV mode for test run",
@@ -792,7 +992,7 @@ def handle_processing_menu(session: Session, use_postgres: bool):
                 default="enqueue"
             )
             run_test_state(session, bv_pv_mode=mode_choice)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
 
 def handle_data_menu(session: Session, engine, use_postgres: bool):
     """Handle data/database actions"""
@@ -812,21 +1012,21 @@ def handle_data_menu(session: Session, engine, use_postgres: bool):
             console.print("\n[bold cyan]Loading Weapons/Equipment[/bold cyan]")
             if Confirm.ask("\nLoad weapons and equipment from CSVs?"):
                 load_all_weapons(session)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "2":
             console.print("\n[bold cyan]Unresolved Weapons[/bold cyan]")
             display_unresolved(session)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "3":
-            status = get_database_status(session)
+            status = get_database_status(session, exact=True)
             display_status(status)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "4":
             if Confirm.ask("\n[red]Delete and rebuild local SQLite database?[/red]"):
                 engine, SessionLocal, session = rebuild_sqlite_database(session, engine)
                 if engine and session:
                     use_postgres = False
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "5":
             if use_postgres:
                 console.print("[yellow]Already using Postgres for this session[/yellow]")
@@ -837,7 +1037,7 @@ def handle_data_menu(session: Session, engine, use_postgres: bool):
                         use_postgres = True
                 except Exception as exc:
                     console.print(f"[red]✗ Failed to switch to Postgres: {exc}[/red]")
-            Prompt.ask("\nPress Enter to continue")
+            pause()
     return engine, session, use_postgres
 
 def handle_utilities_menu(session: Session, use_postgres: bool):
@@ -857,13 +1057,26 @@ def handle_utilities_menu(session: Session, use_postgres: bool):
         elif choice == "1":
             loop = Confirm.ask("Loop and keep polling for jobs?", default=False)
             run_bv_pv_worker(use_postgres, loop=loop)
-            Prompt.ask("\nPress Enter to continue")
+            pause()
         elif choice == "2":
             start_api_server()
-            Prompt.ask("\nPress Enter to continue")
+            pause()
 
 def main():
     """Main application loop"""
+    global EXACT_COUNTS, PAUSE_AFTER_ACTIONS, COMMIT_EVERY_FILES
+    parser = argparse.ArgumentParser(description="BattleTech database manager")
+    parser.add_argument("--exact", action="store_true",
+                        help="Use exact COUNT(*) for every status total instead of planner estimates")
+    parser.add_argument("--no-pause", action="store_true",
+                        help="Don't wait for Enter after each action (for scripted runs)")
+    parser.add_argument("--batch-size", type=int, default=COMMIT_EVERY_FILES,
+                        help=f"Files per commit when ingesting (default: {COMMIT_EVERY_FILES})")
+    args = parser.parse_args()
+    COMMIT_EVERY_FILES = args.batch_size
+    EXACT_COUNTS = args.exact
+    PAUSE_AFTER_ACTIONS = not args.no_pause and sys.stdin.isatty()
+    
     # Ensure folders exist
     for folder_name, folder_path in FOLDERS.items():
         if not folder_path.exists():
@@ -933,8 +1146,9 @@ def main():
                 break
         except Exception as e:
             console.print(f"\n[red]✗ Error: {e}[/red]")
-            console.print("[yellow]Press Enter to continue[/yellow]")
-            input()
+            if PAUSE_AFTER_ACTIONS:
+                console.print("[yellow]Press Enter to continue[/yellow]")
+                input()
     
     session.close()
 
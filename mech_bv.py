@@ -3,7 +3,7 @@
 This keeps the BV math isolated so it can be tested without importing the
 full FastAPI app and DB layers.
 """
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Rows = Gunnery 0..8, Columns = Piloting 0..8
 BV_MULTIPLIER_MATRIX = [
@@ -33,3 +33,19 @@ def compute_adjusted_bv(base_bv: int, base_g: int, base_p: int, target_g: int, t
     conv = target_mult / base_mult
     adjusted = int(round(base_bv * conv))
     return {"multiplier": conv, "adjusted_bv": adjusted, "target_mult": target_mult, "base_mult": base_mult}
+
+
+def compute_adjusted_bv_grid(base_bv: int, base_g: int, base_p: int) -> List[List[Dict[str, Any]]]:
+    """compute_adjusted_bv for every target (grid[g][p]), validating the base once."""
+    base_mult = get_multiplier_for(base_g, base_p)
+    if base_mult == 0:
+        raise ValueError("base multiplier is zero")
+    grid = []
+    for row in BV_MULTIPLIER_MATRIX:
+        out = []
+        for target_mult in row:
+            conv = target_mult / base_mult
+            out.append({"multiplier": conv, "adjusted_bv": int(round(base_bv * conv)),
+                        "target_mult": target_mult, "base_mult": base_mult})
+        grid.append(out)
+    return grid
@@ -8,37 +8,61 @@ Provides endpoints for querying mechs, weapons, loadouts, and statistics.
 
 import os
 import time
+import base64
+import hashlib
 import copy
 from pathlib import Path
 from threading import RLock
+from contextlib import asynccontextmanager
+from collections import defaultdict
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import func, or_, and_, create_engine
-from sqlalchemy.orm import Session, joinedload, sessionmaker
+from sqlalchemy import (
+    func, or_, and_, select, text, tuple_, literal_column, union_all, cast, null,
+    Integer, String, Float
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
 
 from mtf_ingest import (
-    Mech, Location, Slot, Weapon, WeaponInstance, WeaponAlias,
-    ComponentType, Quirk, Manufacturer, Factory,
-    StagingSlot, StagingUnresolved
+    Mech, Location, Slot, Weapon, WeaponInstance, WeaponAlias, Quirk, ComponentType,
+    StagingSlot, StagingUnresolved, STATS_VIEW_NAME, normalize_token
 )
 
 # Import vehicle models
 from blk_ingest import (
-    Vehicle, VehicleLocation, VehicleSlot, VehicleWeaponInstance,
-    VehicleArmor, VehicleSystemManufacturer, StagingVehicleSlot,
-    vehicle_manufacturer_table, vehicle_factory_table
+    Vehicle, VehicleLocation, VehicleSlot,
+    StagingVehicleSlot
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"Database pool: {engine.pool.status()}")
+    # Warm the weapon/component-type lookup tables; misses are loaded lazily,
+    # so an unreachable database here only costs the warm-up
+    try:
+        async with AsyncSessionLocal() as db:
+            await reload_lookup_tables(db)
+        print(f"Lookup tables: {len(WEAPONS_BY_ID)} weapons, {len(COMPONENT_TYPE_NAMES)} component types")
+    except DBAPIError as e:
+        print(f"Skipping lookup table warm-up: {type(e).__name__}")
+    yield
+    await engine.dispose()
+
 # Initialize FastAPI
 app = FastAPI(
     title="BattleTech Mech Database API",
     description="REST API for querying BattleTech mech data, weapons, and loadouts",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for web frontend access
@@ -48,47 +72,124 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+# Connection pool sizing for server databases (ignored for SQLite)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 20)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+
+# Async drivers substituted for the sync URL schemes used by the ETL scripts
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def to_async_url(db_url: str) -> str:
+    """Rewrite a sync SQLAlchemy URL to its async driver equivalent"""
+    scheme, sep, rest = db_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
 # Database session dependency (env-driven, no ETL coupling)
 def _create_engine_from_env():
     db_url = os.getenv("DATABASE_URL") or os.getenv("MEK_DATABASE_URL")
     if not db_url:
         sqlite_path = Path(os.getenv("MEK_SQLITE_PATH", "mech_data_test.db")).resolve()
         db_url = f"sqlite:///{sqlite_path}"
-    connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
-    return db_url, create_engine(db_url, connect_args=connect_args)
+    db_url = to_async_url(db_url)
+    if db_url.startswith("sqlite"):
+        engine_kwargs = {}
+    else:
+        engine_kwargs = {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+        }
+    return db_url, create_async_engine(db_url, pool_pre_ping=True, **engine_kwargs)
 
 DATABASE_URL, engine = _create_engine_from_env()
-SessionLocal = sessionmaker(bind=engine)
+# API sessions only read: no flush checks before queries, no expiry on commit
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Per-request session; the context manager closes it and returns the connection"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+async def count_rows(db: AsyncSession, model, *criteria) -> int:
+    """SELECT COUNT(*) for a model with optional WHERE criteria"""
+    stmt = select(func.count()).select_from(model)
+    if criteria:
+        stmt = stmt.where(*criteria)
+    return await db.scalar(stmt)
+
+
+from mech_bv import get_multiplier_for, compute_adjusted_bv, compute_adjusted_bv_grid, BV_MULTIPLIER_MATRIX
+
+# Optional shared cache backend
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+    REDIS_AVAILABLE = True
+except Exception:
+    redis_asyncio = None
+    RedisError = Exception
+    REDIS_AVAILABLE = False
 
-from mech_bv import get_multiplier_for, compute_adjusted_bv, BV_MULTIPLIER_MATRIX
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+
+    def _cache_dumps(value) -> bytes:
+        return orjson.dumps(value)
+
+    _cache_loads = orjson.loads
+except Exception:
+    import json
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+    def _cache_dumps(value) -> bytes:
+        return json.dumps(value, default=str).encode("utf-8")
+
+    _cache_loads = json.loads
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when installed.
+    Used on routes without a response_model: routes with one are already
+    serialized by pydantic-core, and a custom response class would opt
+    them out of that path.
+    """
+    def render(self, content: Any) -> bytes:
+        if not ORJSON_AVAILABLE:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 # ============================================================================
-# Lightweight TTL cache (in-memory)
+# Response cache (in-memory TTL, or Redis when REDIS_URL is set)
 # ============================================================================
 
-def _env_int(name: str, default: int) -> int:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    try:
-        return int(raw)
-    except ValueError:
-        return default
-
 API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "true").lower() not in {"0", "false", "no"}
 API_CACHE_TTL = _env_int("API_CACHE_TTL", 30)
 LIST_CACHE_TTL = _env_int("API_CACHE_TTL_LIST", API_CACHE_TTL)
-STATS_CACHE_TTL = _env_int("API_CACHE_TTL_STATS", API_CACHE_TTL)
+STATS_CACHE_TTL = _env_int("API_CACHE_TTL_STATS", 60)
+DETAIL_CACHE_TTL = _env_int("API_CACHE_TTL_DETAIL", 86400)
+REDIS_URL = os.getenv("REDIS_URL")
+DETAIL_CACHE_PATTERNS = ("mech_detail*", "vehicle_detail*")
 
 
 class TTLCache:
@@ -96,7 +197,7 @@ class TTLCache:
         self._data = {}
         self._lock = RLock()
 
-    def get(self, key):
+    async def get(self, key):
         if not API_CACHE_ENABLED:
             return None
         now = time.time()
@@ -110,19 +211,90 @@ class TTLCache:
                 return None
             return copy.deepcopy(value)
 
-    def set(self, key, value, ttl: int):
+    async def set(self, key, value, ttl: int):
         if not API_CACHE_ENABLED:
             return
         expires_at = time.time() + ttl
         with self._lock:
             self._data[key] = (expires_at, copy.deepcopy(value))
 
+    async def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Cache shared across workers. Redis errors degrade to cache misses."""
+
+    def __init__(self, url: str, prefix: str = "mek_api:"):
+        self._client = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key):
+        if not API_CACHE_ENABLED:
+            return None
+        try:
+            raw = await self._client.get(self._prefix + key)
+        except RedisError:
+            return None
+        return _cache_loads(raw) if raw is not None else None
+
+    async def set(self, key, value, ttl: int):
+        if not API_CACHE_ENABLED:
+            return
+        try:
+            await self._client.set(self._prefix + key, _cache_dumps(value), ex=ttl)
+        except RedisError:
+            pass
+
+    async def clear(self):
+        """Drop the long-lived detail entries; list/stats entries expire quickly anyway."""
+        try:
+            for pattern in DETAIL_CACHE_PATTERNS:
+                keys = [key async for key in self._client.scan_iter(match=self._prefix + pattern)]
+                if keys:
+                    await self._client.delete(*keys)
+        except RedisError:
+            pass
+
+
+def make_cache_key(name: str, /, **params) -> str:
+    return name + "?" + "&".join(f"{k}={v!r}" for k, v in sorted(params.items()))
 
-def make_cache_key(name: str, **params):
-    return (name, tuple(sorted(params.items())))
 
+def create_cache():
+    if REDIS_URL and REDIS_AVAILABLE:
+        return RedisCache(REDIS_URL)
+    if REDIS_URL:
+        print("REDIS_URL is set but the redis package is not installed; using in-memory cache")
+    return TTLCache()
 
-cache = TTLCache()
+
+cache = create_cache()
+
+
+async def invalidate_response_cache():
+    """Flush cached responses after the underlying rows change (ingest, BV/PV fill-in)"""
+    await cache.clear()
+
+# Client-side caching for detail endpoints: strong ETag over the JSON body
+# and Cache-Control, with 304 on a matching If-None-Match
+HTTP_DETAIL_MAX_AGE = _env_int("API_HTTP_MAX_AGE_DETAIL", 3600)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+def etag_response(payload, if_none_match: Optional[str], max_age: int = HTTP_DETAIL_MAX_AGE) -> Response:
+    """Serialize a JSON-compatible payload with ETag/Cache-Control headers, or 304"""
+    body = _cache_dumps(payload)
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ============================================================================
 # Response Models (Pydantic schemas for API responses)
@@ -136,6 +308,8 @@ class WeaponResponse(BaseModel):
     
     class Config:
         from_attributes = True
+        # instances are shared through WEAPONS_BY_ID
+        frozen = True
 
 class WeaponAliasResponse(BaseModel):
     alias: str
@@ -214,12 +388,137 @@ class StagingStatus(BaseModel):
     vehicle_resolution_rate: float
     top_unresolved: List[Dict[str, Any]]
 
+def build_slot_response(slot) -> SlotResponse:
+    """
+    Build a SlotResponse from a mech or vehicle slot.
+    Weapon and component type come from the process-local lookup tables;
+    call ensure_lookups() for the unit's slots first.
+    """
+    weapon_inst = slot.weapon_instance
+    weapon_data = WEAPONS_BY_ID.get(weapon_inst.weapon_id) if weapon_inst else None
+    
+    return SlotResponse(
+        slot_index=slot.slot_index,
+        raw_text=slot.raw_text,
+        weapon=weapon_data,
+        component_type=COMPONENT_TYPE_NAMES.get(slot.component_type_id),
+        note=slot.note
+    )
+
+def rows_to_models(model_cls, rows) -> list:
+    """Build response models straight from Core row tuples (skips ORM and validation)"""
+    return [model_cls.model_construct(**row._mapping) for row in rows]
+
+# Columns selected by list endpoints; labels match the summary model fields
+MECH_SUMMARY_COLUMNS = (
+    Mech.id, Mech.chassis, Mech.model, Mech.mul_id,
+    Mech.config, Mech.techbase, Mech.era, Mech.role
+)
+WEAPON_COLUMNS = (Weapon.id, Weapon.name, Weapon.category, Weapon.damage)
+
+# Cursor keys for list items, in ORDER BY order (weapon names are unique)
+def mech_sort_key(item: dict) -> list:
+    return [item["chassis"], item["model"] or "", item["id"]]
+
+def vehicle_sort_key(item: dict) -> list:
+    return [item["name"], item["model"] or "", item["id"]]
+
+def weapon_sort_key(item: dict) -> list:
+    return [item["name"]]
+
+# Process-local lookup tables. Weapons and component types are effectively
+# static after ingest, so detail endpoints resolve slot references from
+# memory. Loaded at startup, topped up on a miss, and rebuilt by
+# POST /admin/reload-caches.
+WEAPONS_BY_ID: Dict[int, WeaponResponse] = {}
+COMPONENT_TYPE_NAMES: Dict[int, str] = {}
+
+async def reload_lookup_tables(db: AsyncSession):
+    """Replace the weapon and component-type lookup tables from the database"""
+    weapons = rows_to_models(WeaponResponse, await db.execute(select(*WEAPON_COLUMNS)))
+    names = await db.execute(select(ComponentType.id, ComponentType.name))
+    WEAPONS_BY_ID.clear()
+    WEAPONS_BY_ID.update({w.id: w for w in weapons})
+    COMPONENT_TYPE_NAMES.clear()
+    COMPONENT_TYPE_NAMES.update(names.tuples().all())
+
+def weapon_response(weapon: Weapon) -> WeaponResponse:
+    """WeaponResponse for an ORM weapon, built once and reused via WEAPONS_BY_ID"""
+    cached = WEAPONS_BY_ID.get(weapon.id)
+    if cached is None:
+        cached = WEAPONS_BY_ID[weapon.id] = WeaponResponse.model_construct(
+            id=weapon.id, name=weapon.name, category=weapon.category, damage=weapon.damage
+        )
+    return cached
+
+async def ensure_lookups(db: AsyncSession, slots):
+    """Load weapons/component types referenced by `slots` that are missing from the lookup tables"""
+    weapon_ids = {
+        s.weapon_instance.weapon_id for s in slots
+        if s.weapon_instance and s.weapon_instance.weapon_id is not None
+    } - WEAPONS_BY_ID.keys()
+    type_ids = {s.component_type_id for s in slots if s.component_type_id is not None} - COMPONENT_TYPE_NAMES.keys()
+    
+    if weapon_ids:
+        WEAPONS_BY_ID.update({w.id: w for w in rows_to_models(WeaponResponse, await db.execute(
+            select(*WEAPON_COLUMNS).where(Weapon.id.in_(weapon_ids))
+        ))})
+    if type_ids:
+        COMPONENT_TYPE_NAMES.update((await db.execute(
+            select(ComponentType.id, ComponentType.name).where(ComponentType.id.in_(type_ids))
+        )).tuples().all())
+
+# Keyset pagination: list endpoints page on their ORDER BY key instead of
+# OFFSET. The next page's cursor goes out in the X-Next-Cursor header (the
+# body stays a plain list) and comes back as ?cursor=...
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort expressions must match ix_mech_list_order / ix_vehicle_list_order;
+# literal '' (not a bind param) so Postgres can match the index expression
+MECH_MODEL_SORT = func.coalesce(Mech.model, literal_column("''"))
+VEHICLE_MODEL_SORT = func.coalesce(Vehicle.model, literal_column("''"))
+
+def encode_cursor(key: list) -> str:
+    """Opaque, URL-safe cursor for a sort key"""
+    return base64.urlsafe_b64encode(_cache_dumps(key)).decode("ascii")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor made by encode_cursor(); 400 if malformed"""
+    try:
+        key = _cache_loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        key = None
+    if not isinstance(key, list) or len(key) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+def set_next_cursor(response: Response, items: list, limit: int, sort_key):
+    """Point X-Next-Cursor past the last item when the page is full"""
+    if len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort_key(items[-1]))
+
+# NDJSON streaming: rows are encoded and sent as the DB returns them from a
+# server-side cursor, so large pages never sit in memory as one list
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_ROWS = 100
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+async def stream_ndjson(stmt):
+    """Yield rows of a Core select as NDJSON, a batch of lines per chunk"""
+    # own session: the request's get_db session may close before the body is sent
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for rows in result.partitions(STREAM_BATCH_ROWS):
+            yield b"".join(_cache_dumps(dict(row._mapping)) + b"\n" for row in rows)
+
 # ============================================================================
 # Health Check
 # ============================================================================
 
-@app.get("/")
-def root():
+@app.get("/", response_class=FastJSONResponse)
+async def root():
     """API root - health check"""
     return {
         "status": "online",
@@ -228,13 +527,13 @@ def root():
         "database": "connected"
     }
 
-@app.get("/health")
-def health_check(db: Session = Depends(get_db)):
+@app.get("/health", response_class=FastJSONResponse)
+async def health_check(db: AsyncSession = Depends(get_db)):
     """Detailed health check with database statistics"""
     try:
-        mech_count = db.query(Mech).count()
-        weapon_count = db.query(Weapon).count()
-        vehicle_count = db.query(Vehicle).count()
+        mech_count = await count_rows(db, Mech)
+        weapon_count = await count_rows(db, Weapon)
+        vehicle_count = await count_rows(db, Vehicle)
         
         return {
             "status": "healthy",
@@ -252,54 +551,67 @@ def health_check(db: Session = Depends(get_db)):
 # ============================================================================
 
 @app.get("/mechs", response_model=List[MechSummary])
-def list_mechs(
-    skip: int = Query(0, ge=0),
+async def list_mechs(
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     chassis: Optional[str] = None,
     techbase: Optional[str] = None,
     era: Optional[str] = None,
     role: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List mechs with optional filtering.
+    Send `Accept: application/x-ndjson` to stream one JSON object per line
+    instead (uncached, no X-Next-Cursor).
     
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (deprecated, use cursor)
     - **limit**: Maximum number of records to return
+    - **cursor**: X-Next-Cursor header value from the previous page
     - **chassis**: Filter by chassis name (partial match)
     - **techbase**: Filter by techbase (IS, Clan, Mixed)
     - **era**: Filter by era
     - **role**: Filter by role
     - **search**: Search across chassis and model
     """
+    after = decode_cursor(cursor, 3) if cursor else None
     cache_key = make_cache_key(
         "list_mechs",
         skip=skip,
         limit=limit,
+        cursor=cursor,
         chassis=chassis,
         techbase=techbase,
         era=era,
         role=role,
         search=search
     )
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
-
-    query = db.query(Mech)
+    streaming = wants_ndjson(accept)
+    if not streaming:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            set_next_cursor(response, cached, limit, mech_sort_key)
+            return cached
+
+    stmt = select(*MECH_SUMMARY_COLUMNS)
     
     # Apply filters
+    if after:
+        stmt = stmt.where(tuple_(Mech.chassis, MECH_MODEL_SORT, Mech.id) > tuple_(*after))
     if chassis:
-        query = query.filter(Mech.chassis.ilike(f"%{chassis}%"))
+        stmt = stmt.where(Mech.chassis.ilike(f"%{chassis}%"))
     if techbase:
-        query = query.filter(Mech.techbase.ilike(f"%{techbase}%"))
+        stmt = stmt.where(Mech.techbase.ilike(f"%{techbase}%"))
     if era:
-        query = query.filter(Mech.era.ilike(f"%{era}%"))
+        stmt = stmt.where(Mech.era.ilike(f"%{era}%"))
     if role:
-        query = query.filter(Mech.role.ilike(f"%{role}%"))
+        stmt = stmt.where(Mech.role.ilike(f"%{role}%"))
     if search:
-        query = query.filter(
+        stmt = stmt.where(
             or_(
                 Mech.chassis.ilike(f"%{search}%"),
                 Mech.model.ilike(f"%{search}%")
@@ -307,79 +619,44 @@ def list_mechs(
         )
     
     # Order and paginate
-    mechs = query.order_by(Mech.chassis, Mech.model).offset(skip).limit(limit).all()
-    response = [MechSummary.from_orm(m).model_dump() for m in mechs]
-    cache.set(cache_key, response, LIST_CACHE_TTL)
-    return response
-
-@app.get("/mechs/{mech_id}", response_model=MechDetail)
-def get_mech(mech_id: int, db: Session = Depends(get_db)):
-    """
-    Get detailed information about a specific mech including:
-    - Full specifications
-    - All locations and equipment slots
-    - Weapons and components
-    - Quirks
-    - Manufacturers
-    """
-    mech = db.query(Mech).options(
-        joinedload(Mech.locations).joinedload(Location.slots),
-        joinedload(Mech.quirks)
-    ).filter(Mech.id == mech_id).first()
+    stmt = stmt.order_by(Mech.chassis, MECH_MODEL_SORT, Mech.id).offset(0 if after else skip).limit(limit)
+    if streaming:
+        return StreamingResponse(stream_ndjson(stmt), media_type=NDJSON_MEDIA_TYPE)
+    rows = await db.execute(stmt)
+    items = [m.model_dump() for m in rows_to_models(MechSummary, rows)]
+    await cache.set(cache_key, items, LIST_CACHE_TTL)
+    set_next_cursor(response, items, limit, mech_sort_key)
+    return items
+
+async def load_mech_detail(db: AsyncSession, criterion) -> Optional[MechDetail]:
+    """Load and build the mech detail response for the mech matching `criterion`"""
+    mech = (await db.execute(select(Mech).options(
+        selectinload(Mech.locations).selectinload(Location.slots).joinedload(Slot.weapon_instance),
+        selectinload(Mech.quirks),
+        selectinload(Mech.manufacturers),
+        selectinload(Mech.factories)
+    ).where(criterion))).scalar_one_or_none()
     
     if not mech:
-        raise HTTPException(status_code=404, detail=f"Mech {mech_id} not found")
+        return None
     
-    # Build detailed response
+    # Build detailed response from the eager-loaded graph; locations and
+    # slots arrive in display order (relationship order_by)
+    await ensure_lookups(db, [slot for loc in mech.locations for slot in loc.slots])
     locations_data = []
-    for loc in sorted(mech.locations, key=lambda l: l.position_order or 0):
-        slots_data = []
-        for slot in sorted(loc.slots, key=lambda s: s.slot_index):
-            # Get weapon if exists
-            weapon_inst = db.query(WeaponInstance).filter(
-                WeaponInstance.slot_id == slot.id
-            ).first()
-            
-            weapon_data = None
-            if weapon_inst and weapon_inst.weapon_id:
-                weapon = db.query(Weapon).get(weapon_inst.weapon_id)
-                if weapon:
-                    weapon_data = WeaponResponse.from_orm(weapon)
-            
-            # Get component type if exists
-            component_name = None
-            if slot.component_type_id:
-                comp = db.query(ComponentType).get(slot.component_type_id)
-                if comp:
-                    component_name = comp.name
-            
-            slots_data.append(SlotResponse(
-                slot_index=slot.slot_index,
-                raw_text=slot.raw_text,
-                weapon=weapon_data,
-                component_type=component_name,
-                note=slot.note
-            ))
-        
+    for loc in mech.locations:
         locations_data.append(LocationResponse(
             name=loc.name,
-            slots=slots_data
+            slots=[build_slot_response(slot) for slot in loc.slots]
         ))
     
-    # Get manufacturers
-    manufacturers = [m.name for m in db.query(Manufacturer).join(
-        Mech.manufacturers
-    ).filter(Mech.id == mech_id).all()]
-    
-    # Get factories
-    factories = [f.name for f in db.query(Factory).join(
-        Mech.factories
-    ).filter(Mech.id == mech_id).all()]
+    manufacturers = [m.name for m in mech.manufacturers]
+    factories = [f.name for f in mech.factories]
     
     # Get quirks
     quirks_data = [QuirkResponse.from_orm(q) for q in mech.quirks]
     
-    return MechDetail(
+    result = MechDetail(
         id=mech.id,
         chassis=mech.chassis,
         model=mech.model,
@@ -396,17 +673,42 @@ def get_mech(mech_id: int, db: Session = Depends(get_db)):
         manufacturers=manufacturers,
         factories=factories
     )
+    return result
 
-
-@app.get("/mechs/{mech_id}/bv")
-def get_mech_bv(
+@app.get("/mechs/{mech_id}", response_model=MechDetail)
+async def get_mech(
+    mech_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get detailed information about a specific mech including:
+    - Full specifications
+    - All locations and equipment slots
+    - Weapons and components
+    - Quirks
+    - Manufacturers
+    """
+    cache_key = make_cache_key("mech_detail", mech_id=mech_id)
+    payload = await cache.get(cache_key)
+    if payload is None:
+        result = await load_mech_detail(db, Mech.id == mech_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Mech {mech_id} not found")
+        payload = result.model_dump(mode="json")
+        await cache.set(cache_key, payload, DETAIL_CACHE_TTL)
+    return etag_response(payload, if_none_match)
+
+
+@app.get("/mechs/{mech_id}/bv", response_class=FastJSONResponse)
+async def get_mech_bv(
     mech_id: int,
     target_g: Optional[int] = Query(None, ge=0, le=8, description="Target Gunnery 0..8"),
     target_p: Optional[int] = Query(None, ge=0, le=8, description="Target Piloting 0..8"),
     base_g: int = Query(5, ge=0, le=8, description="Base Gunnery assumed for stored BV (default 5)"),
     base_p: int = Query(4, ge=0, le=8, description="Base Piloting assumed for stored BV (default 4)"),
     all_grid: bool = Query(False, description="If true, return the adjusted BV for the full 9x9 g/p grid"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Return BV information for a mech.
 
@@ -414,7 +716,7 @@ def get_mech_bv(
     - If both target_g and target_p are provided, returns a single adjusted BV using the multiplier matrix.
     - If all_grid=true a full 9x9 mapping of adjusted BV is returned (target entries for all combinations).
     """
-    mech = db.query(Mech).filter(Mech.id == mech_id).first()
+    mech = (await db.execute(select(Mech).where(Mech.id == mech_id))).scalar_one_or_none()
     if not mech:
         raise HTTPException(status_code=404, detail=f"Mech {mech_id} not found")
 
@@ -425,13 +727,13 @@ def get_mech_bv(
 
     # If all grid requested, compute adjusted for all g/p
     if all_grid:
-        grid = {}
-        for g in range(0, 9):
-            row = {}
-            for p in range(0, 9):
-                info = compute_adjusted_bv(base_bv, base_g, base_p, g, p)
-                row[str(p)] = {"adjusted_bv": info["adjusted_bv"], "multiplier": round(info["multiplier"], 6)}
-            grid[str(g)] = row
+        grid = {
+            str(g): {
+                str(p): {"adjusted_bv": info["adjusted_bv"], "multiplier": round(info["multiplier"], 6)}
+                for p, info in enumerate(row)
+            }
+            for g, row in enumerate(compute_adjusted_bv_grid(base_bv, base_g, base_p))
+        }
         return {
             "mech_id": mech_id,
             "base_bv": base_bv,
@@ -473,12 +775,21 @@ def get_mech_bv(
     }
 
 @app.get("/mechs/by-mul-id/{mul_id}", response_model=MechDetail)
-def get_mech_by_mul_id(mul_id: int, db: Session = Depends(get_db)):
+async def get_mech_by_mul_id(
+    mul_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
     """Get mech by Master Unit List ID"""
-    mech = db.query(Mech).filter(Mech.mul_id == mul_id).first()
-    if not mech:
-        raise HTTPException(status_code=404, detail=f"Mech with MUL ID {mul_id} not found")
-    return get_mech(mech.id, db)
+    cache_key = make_cache_key("mech_detail_by_mul", mul_id=mul_id)
+    payload = await cache.get(cache_key)
+    if payload is None:
+        result = await load_mech_detail(db, Mech.mul_id == mul_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Mech with MUL ID {mul_id} not found")
+        payload = result.model_dump(mode="json")
+        await cache.set(cache_key, payload, DETAIL_CACHE_TTL)
+    return etag_response(payload, if_none_match)
 
 # ============================================================================
 # Vehicle Endpoints
@@ -511,137 +822,104 @@ class VehicleDetail(VehicleSummary):
     factories: List[str] = []
     system_manufacturers: Dict[str, str] = {}
 
+VEHICLE_SUMMARY_COLUMNS = (
+    Vehicle.id, Vehicle.name, Vehicle.model, Vehicle.mul_id,
+    Vehicle.unit_type, Vehicle.year, Vehicle.role, Vehicle.tonnage
+)
+
 @app.get("/vehicles", response_model=List[VehicleSummary])
-def list_vehicles(
-    skip: int = Query(0, ge=0),
+async def list_vehicles(
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     name: Optional[str] = None,
     unit_type: Optional[str] = None,
     role: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List vehicles with optional filtering.
     
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (deprecated, use cursor)
     - **limit**: Maximum number of records to return
+    - **cursor**: X-Next-Cursor header value from the previous page
     - **name**: Filter by name (partial match)
     - **unit_type**: Filter by unit type (Tank, VTOL, Aerospace, etc.)
     - **role**: Filter by role
     - **search**: Search across name and model
     """
+    after = decode_cursor(cursor, 3) if cursor else None
     cache_key = make_cache_key(
         "list_vehicles",
         skip=skip,
         limit=limit,
+        cursor=cursor,
         name=name,
         unit_type=unit_type,
         role=role,
         search=search
     )
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
     if cached is not None:
+        set_next_cursor(response, cached, limit, vehicle_sort_key)
         return cached
 
-    query = db.query(Vehicle)
+    stmt = select(*VEHICLE_SUMMARY_COLUMNS)
     
+    if after:
+        stmt = stmt.where(tuple_(Vehicle.name, VEHICLE_MODEL_SORT, Vehicle.id) > tuple_(*after))
     if name:
-        query = query.filter(Vehicle.name.ilike(f"%{name}%"))
+        stmt = stmt.where(Vehicle.name.ilike(f"%{name}%"))
     if unit_type:
-        query = query.filter(Vehicle.unit_type.ilike(f"%{unit_type}%"))
+        stmt = stmt.where(Vehicle.unit_type.ilike(f"%{unit_type}%"))
     if role:
-        query = query.filter(Vehicle.role.ilike(f"%{role}%"))
+        stmt = stmt.where(Vehicle.role.ilike(f"%{role}%"))
     if search:
-        query = query.filter(
+        stmt = stmt.where(
             or_(
                 Vehicle.name.ilike(f"%{search}%"),
                 Vehicle.model.ilike(f"%{search}%")
             )
         )
     
-    vehicles = query.order_by(Vehicle.name, Vehicle.model).offset(skip).limit(limit).all()
-    response = [VehicleSummary.from_orm(v).model_dump() for v in vehicles]
-    cache.set(cache_key, response, LIST_CACHE_TTL)
-    return response
-
-@app.get("/vehicles/{vehicle_id}", response_model=VehicleDetail)
-def get_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
-    """
-    Get detailed information about a specific vehicle including:
-    - Full specifications
-    - All locations and equipment
-    - Armor values
-    - Manufacturers and factories
-    """
-    vehicle = db.query(Vehicle).options(
-        joinedload(Vehicle.locations).joinedload(VehicleLocation.slots)
-    ).filter(Vehicle.id == vehicle_id).first()
+    rows = await db.execute(stmt.order_by(
+        Vehicle.name, VEHICLE_MODEL_SORT, Vehicle.id
+    ).offset(0 if after else skip).limit(limit))
+    items = [v.model_dump() for v in rows_to_models(VehicleSummary, rows)]
+    await cache.set(cache_key, items, LIST_CACHE_TTL)
+    set_next_cursor(response, items, limit, vehicle_sort_key)
+    return items
+
+async def load_vehicle_detail(db: AsyncSession, criterion) -> Optional[VehicleDetail]:
+    """Load and build the vehicle detail response for the vehicle matching `criterion`"""
+    vehicle = (await db.execute(select(Vehicle).options(
+        selectinload(Vehicle.locations).selectinload(VehicleLocation.slots).joinedload(VehicleSlot.weapon_instance),
+        selectinload(Vehicle.armor),
+        selectinload(Vehicle.manufacturers),
+        selectinload(Vehicle.factories),
+        selectinload(Vehicle.system_manufacturers)
+    ).where(criterion))).scalar_one_or_none()
     
     if not vehicle:
-        raise HTTPException(status_code=404, detail=f"Vehicle {vehicle_id} not found")
+        return None
     
     # Build locations
+    await ensure_lookups(db, [slot for loc in vehicle.locations for slot in loc.slots])
     locations_data = []
     for loc in vehicle.locations:
-        slots_data = []
-        for slot in sorted(loc.slots, key=lambda s: s.slot_index):
-            weapon_inst = db.query(VehicleWeaponInstance).filter(
-                VehicleWeaponInstance.slot_id == slot.id
-            ).first()
-            
-            weapon_data = None
-            if weapon_inst and weapon_inst.weapon_id:
-                weapon = db.query(Weapon).get(weapon_inst.weapon_id)
-                if weapon:
-                    weapon_data = WeaponResponse.from_orm(weapon)
-            
-            component_name = None
-            if slot.component_type_id:
-                comp = db.query(ComponentType).get(slot.component_type_id)
-                if comp:
-                    component_name = comp.name
-            
-            slots_data.append(SlotResponse(
-                slot_index=slot.slot_index,
-                raw_text=slot.raw_text,
-                weapon=weapon_data,
-                component_type=component_name,
-                note=slot.note
-            ))
-        
         locations_data.append(LocationResponse(
             name=loc.name,
-            slots=slots_data
+            slots=[build_slot_response(slot) for slot in loc.slots]
         ))
     
-    # Get armor
-    armor_dict = {}
-    armor_records = db.query(VehicleArmor).filter(
-        VehicleArmor.vehicle_id == vehicle_id
-    ).all()
-    for ar in armor_records:
-        armor_dict[ar.location] = ar.points
-    
-    # Get manufacturers
-    manufacturers = [m.name for m in db.query(Manufacturer).join(
-        vehicle_manufacturer_table
-    ).filter(vehicle_manufacturer_table.c.vehicle_id == vehicle_id).all()]
-    
-    # Get factories
-    factories = [f.name for f in db.query(Factory).join(
-        vehicle_factory_table
-    ).filter(vehicle_factory_table.c.vehicle_id == vehicle_id).all()]
+    armor_dict = {ar.location: ar.points for ar in vehicle.armor}
+    manufacturers = [m.name for m in vehicle.manufacturers]
+    factories = [f.name for f in vehicle.factories]
+    sys_mfg_dict = {sm.system_type: sm.manufacturer_name for sm in vehicle.system_manufacturers}
     
-    # Get system manufacturers
-    sys_mfg_dict = {}
-    sys_mfgs = db.query(VehicleSystemManufacturer).filter(
-        VehicleSystemManufacturer.vehicle_id == vehicle_id
-    ).all()
-    for sm in sys_mfgs:
-        sys_mfg_dict[sm.system_type] = sm.manufacturer_name
-    
-    return VehicleDetail(
+    result = VehicleDetail(
         id=vehicle.id,
         name=vehicle.name,
         model=vehicle.model,
@@ -663,126 +941,190 @@ def get_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
         factories=factories,
         system_manufacturers=sys_mfg_dict
     )
+    return result
+
+@app.get("/vehicles/{vehicle_id}", response_model=VehicleDetail)
+async def get_vehicle(
+    vehicle_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get detailed information about a specific vehicle including:
+    - Full specifications
+    - All locations and equipment
+    - Armor values
+    - Manufacturers and factories
+    """
+    cache_key = make_cache_key("vehicle_detail", vehicle_id=vehicle_id)
+    payload = await cache.get(cache_key)
+    if payload is None:
+        result = await load_vehicle_detail(db, Vehicle.id == vehicle_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Vehicle {vehicle_id} not found")
+        payload = result.model_dump(mode="json")
+        await cache.set(cache_key, payload, DETAIL_CACHE_TTL)
+    return etag_response(payload, if_none_match)
 
 @app.get("/vehicles/by-mul-id/{mul_id}", response_model=VehicleDetail)
-def get_vehicle_by_mul_id(mul_id: int, db: Session = Depends(get_db)):
+async def get_vehicle_by_mul_id(
+    mul_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
     """Get vehicle by Master Unit List ID"""
-    vehicle = db.query(Vehicle).filter(Vehicle.mul_id == mul_id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail=f"Vehicle with MUL ID {mul_id} not found")
-    return get_vehicle(vehicle.id, db)
+    cache_key = make_cache_key("vehicle_detail_by_mul", mul_id=mul_id)
+    payload = await cache.get(cache_key)
+    if payload is None:
+        result = await load_vehicle_detail(db, Vehicle.mul_id == mul_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Vehicle with MUL ID {mul_id} not found")
+        payload = result.model_dump(mode="json")
+        await cache.set(cache_key, payload, DETAIL_CACHE_TTL)
+    return etag_response(payload, if_none_match)
 
 # ============================================================================
 # Weapon Endpoints
 # ============================================================================
 
 @app.get("/weapons", response_model=List[WeaponResponse])
-def list_weapons(
-    skip: int = Query(0, ge=0),
+async def list_weapons(
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List all weapons with optional filtering.
     
+    - **cursor**: X-Next-Cursor header value from the previous page
     - **category**: Filter by category (IS, Clan, etc.)
     - **search**: Search weapon names
     """
+    after = decode_cursor(cursor, 1) if cursor else None
     cache_key = make_cache_key(
         "list_weapons",
         skip=skip,
         limit=limit,
+        cursor=cursor,
         category=category,
         search=search
     )
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
     if cached is not None:
+        set_next_cursor(response, cached, limit, weapon_sort_key)
         return cached
 
-    query = db.query(Weapon)
+    stmt = select(*WEAPON_COLUMNS)
     
+    if after:
+        stmt = stmt.where(Weapon.name > after[0])
     if category:
-        query = query.filter(Weapon.category.ilike(f"%{category}%"))
+        stmt = stmt.where(Weapon.category.ilike(f"%{category}%"))
     if search:
-        query = query.filter(Weapon.name.ilike(f"%{search}%"))
+        stmt = stmt.where(Weapon.name.ilike(f"%{search}%"))
     
-    weapons = query.order_by(Weapon.name).offset(skip).limit(limit).all()
-    response = [WeaponResponse.from_orm(w).model_dump() for w in weapons]
-    cache.set(cache_key, response, LIST_CACHE_TTL)
-    return response
+    rows = await db.execute(stmt.order_by(Weapon.name).offset(0 if after else skip).limit(limit))
+    items = [w.model_dump() for w in rows_to_models(WeaponResponse, rows)]
+    await cache.set(cache_key, items, LIST_CACHE_TTL)
+    set_next_cursor(response, items, limit, weapon_sort_key)
+    return items
 
 @app.get("/weapons/{weapon_id}", response_model=WeaponResponse)
-def get_weapon(weapon_id: int, db: Session = Depends(get_db)):
+async def get_weapon(
+    weapon_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
     """Get detailed weapon information"""
-    weapon = db.query(Weapon).filter(Weapon.id == weapon_id).first()
+    weapon = await db.get(Weapon, weapon_id)
     if not weapon:
         raise HTTPException(status_code=404, detail=f"Weapon {weapon_id} not found")
-    return weapon
+    return etag_response(WeaponResponse.model_validate(weapon).model_dump(), if_none_match)
 
 @app.get("/weapons/{weapon_id}/aliases", response_model=List[str])
-def get_weapon_aliases(weapon_id: int, db: Session = Depends(get_db)):
+async def get_weapon_aliases(weapon_id: int, db: AsyncSession = Depends(get_db)):
     """Get all aliases for a weapon"""
-    weapon = db.query(Weapon).filter(Weapon.id == weapon_id).first()
+    weapon = await db.get(Weapon, weapon_id)
     if not weapon:
         raise HTTPException(status_code=404, detail=f"Weapon {weapon_id} not found")
     
-    aliases = db.query(WeaponAlias.alias).filter(
+    aliases = await db.scalars(select(WeaponAlias.alias).where(
         WeaponAlias.weapon_id == weapon_id
-    ).all()
-    return [a[0] for a in aliases]
+    ))
+    return aliases.all()
 
 @app.get("/weapons/{weapon_id}/mechs", response_model=List[MechSummary])
-def get_mechs_with_weapon(
+async def get_mechs_with_weapon(
     weapon_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all mechs that mount a specific weapon"""
-    weapon = db.query(Weapon).filter(Weapon.id == weapon_id).first()
-    if not weapon:
+    weapon_exists = await db.scalar(select(Weapon.id).where(Weapon.id == weapon_id))
+    if weapon_exists is None:
         raise HTTPException(status_code=404, detail=f"Weapon {weapon_id} not found")
     
-    mechs = db.query(Mech).join(Location).join(Slot).join(
-        WeaponInstance
-    ).filter(
+    # Semi-join instead of JOIN + DISTINCT over every slot row: the weapon_id
+    # filter is resolved from ix_weapon_instance_weapon_slot and
+    # ix_slot_id_location without touching the slot/weapon_instance heaps.
+    # Check the plan with EXPLAIN ANALYZE (Postgres) or EXPLAIN QUERY PLAN
+    # (SQLite) after schema changes; it should show index-only scans there.
+    mech_ids = select(Location.mech_id).join(
+        Slot, Slot.location_id == Location.id
+    ).join(
+        WeaponInstance, WeaponInstance.slot_id == Slot.id
+    ).where(
         WeaponInstance.weapon_id == weapon_id
-    ).distinct().offset(skip).limit(limit).all()
+    )
+    result = await db.execute(select(*MECH_SUMMARY_COLUMNS).where(
+        Mech.id.in_(mech_ids)
+    ).order_by(Mech.id).offset(skip).limit(limit))
     
-    return mechs
+    return rows_to_models(MechSummary, result)
 
-@app.get("/weapons/search/{query_text}")
-def search_weapons(query_text: str, db: Session = Depends(get_db)):
+@app.get("/weapons/search/{query_text}", response_class=FastJSONResponse)
+async def search_weapons(query_text: str, db: AsyncSession = Depends(get_db)):
     """
     Search weapons by name or alias.
     Returns both exact matches and fuzzy matches.
     """
-    # Normalize query
-    normalized_query = query_text.strip().lower()
+    # Normalize once, the same way ingest normalizes weapon names and aliases
+    # (lowercase, punctuation folded), so every branch below compares against
+    # stored values as-is: no per-row lower()/ILIKE needed
+    normalized_query = normalize_token(query_text) or query_text.strip().lower()
     
     # Find by exact name
-    exact = db.query(Weapon).filter(
+    exact = (await db.scalars(select(Weapon).where(
         Weapon.name == normalized_query
-    ).first()
+    ))).first()
     
     # Find by alias
-    alias_match = db.query(Weapon).join(WeaponAlias).filter(
+    alias_match = (await db.scalars(select(Weapon).join(WeaponAlias).where(
         WeaponAlias.alias == normalized_query
-    ).first()
+    ))).first()
     
-    # Find by partial match
-    partial_matches = db.query(Weapon).filter(
-        Weapon.name.ilike(f"%{normalized_query}%")
-    ).limit(10).all()
+    # Find by partial match; on Postgres the LIKE is served by the
+    # weapon.name trigram index. Closest names first: prefix hits, then
+    # shortest (ranking doesn't rely on pg_trgm being installed)
+    partial_matches = (await db.scalars(select(Weapon).where(
+        Weapon.name.like(f"%{normalized_query}%")
+    ).order_by(
+        Weapon.name.like(f"{normalized_query}%").desc(),
+        func.length(Weapon.name),
+        Weapon.name
+    ).limit(10))).all()
     
     return {
         "query": query_text,
         "normalized": normalized_query,
-        "exact_match": WeaponResponse.from_orm(exact) if exact else None,
-        "alias_match": WeaponResponse.from_orm(alias_match) if alias_match else None,
-        "partial_matches": [WeaponResponse.from_orm(w) for w in partial_matches]
+        "exact_match": weapon_response(exact) if exact else None,
+        "alias_match": weapon_response(alias_match) if alias_match else None,
+        "partial_matches": [weapon_response(w) for w in partial_matches]
     }
 
 # ============================================================================
@@ -790,42 +1132,57 @@ def search_weapons(query_text: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @app.get("/stats/overview", response_model=MechStatistics)
-def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db: AsyncSession = Depends(get_db)):
     """Get overall database statistics"""
     cache_key = make_cache_key("stats_overview")
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
     if cached is not None:
         return cached
-    total_mechs = db.query(Mech).count()
-    total_vehicles = db.query(Vehicle).count()
-    total_weapons = db.query(Weapon).count()
-    total_locations = db.query(Location).count() + db.query(VehicleLocation).count()
-    total_slots = db.query(Slot).count() + db.query(VehicleSlot).count()
+
+    # Postgres: read the materialized view refreshed by the ingest scripts
+    if engine.dialect.name == "postgresql":
+        try:
+            payload = await db.scalar(
+                text(f"SELECT payload FROM {STATS_VIEW_NAME}").columns(payload=JSONB)
+            )
+        except DBAPIError:
+            await db.rollback()
+            payload = None
+        if payload is not None:
+            result = MechStatistics(**payload)
+            await cache.set(cache_key, result.model_dump(), STATS_CACHE_TTL)
+            return result
+
+    total_mechs = await count_rows(db, Mech)
+    total_vehicles = await count_rows(db, Vehicle)
+    total_weapons = await count_rows(db, Weapon)
+    total_locations = await count_rows(db, Location) + await count_rows(db, VehicleLocation)
+    total_slots = await count_rows(db, Slot) + await count_rows(db, VehicleSlot)
     
     # Breakdown by techbase (mechs only)
     by_techbase = {}
-    techbase_counts = db.query(
+    techbase_counts = await db.execute(select(
         Mech.techbase,
         func.count(Mech.id)
-    ).group_by(Mech.techbase).all()
+    ).group_by(Mech.techbase))
     for tb, count in techbase_counts:
         by_techbase[tb or "Unknown"] = count
     
     # Breakdown by era
     by_era = {}
-    era_counts = db.query(
+    era_counts = await db.execute(select(
         Mech.era,
         func.count(Mech.id)
-    ).group_by(Mech.era).all()
+    ).group_by(Mech.era))
     for era, count in era_counts:
         by_era[era or "Unknown"] = count
     
     # Breakdown by role
     by_role = {}
-    role_counts = db.query(
+    role_counts = await db.execute(select(
         Mech.role,
         func.count(Mech.id)
-    ).group_by(Mech.role).all()
+    ).group_by(Mech.role))
     for role, count in role_counts:
         by_role[role or "Unknown"] = count
     
@@ -839,27 +1196,27 @@ def get_statistics(db: Session = Depends(get_db)):
         by_era=by_era,
         by_role=by_role
     )
-    cache.set(cache_key, result.model_dump(), STATS_CACHE_TTL)
+    await cache.set(cache_key, result.model_dump(), STATS_CACHE_TTL)
     return result
 
 @app.get("/stats/weapons", response_model=List[WeaponStatistics])
-def get_weapon_statistics(
+async def get_weapon_statistics(
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get weapon usage statistics.
     Shows most commonly used weapons across all mechs.
     """
     cache_key = make_cache_key("stats_weapons", limit=limit)
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
     if cached is not None:
         return cached
-    stats = db.query(
+    stats = await db.execute(select(
         Weapon.name,
         func.count(WeaponInstance.id).label('total_instances'),
         func.count(func.distinct(Mech.id)).label('mech_count')
-    ).join(
+    ).select_from(Weapon).join(
         WeaponInstance, Weapon.id == WeaponInstance.weapon_id
     ).join(
         Slot, WeaponInstance.slot_id == Slot.id
@@ -871,7 +1228,7 @@ def get_weapon_statistics(
         Weapon.name
     ).order_by(
         func.count(WeaponInstance.id).desc()
-    ).limit(limit).all()
+    ).limit(limit))
     
     results = []
     for name, total, mech_count in stats:
@@ -882,37 +1239,37 @@ def get_weapon_statistics(
             avg_per_mech=round(total / mech_count, 2) if mech_count > 0 else 0
         ))
     
-    cache.set(cache_key, [r.model_dump() for r in results], STATS_CACHE_TTL)
+    await cache.set(cache_key, [r.model_dump() for r in results], STATS_CACHE_TTL)
     return results
 
 @app.get("/stats/staging", response_model=StagingStatus)
-def get_staging_status(db: Session = Depends(get_db)):
+async def get_staging_status(db: AsyncSession = Depends(get_db)):
     """
     Get staging resolution statistics.
     Shows how well the ingestion/resolution process is working.
     """
     cache_key = make_cache_key("stats_staging")
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
     if cached is not None:
         return cached
     # Mech staging
-    total = db.query(StagingSlot).count()
-    resolved = db.query(StagingSlot).filter(StagingSlot.resolved == True).count()
+    total = await count_rows(db, StagingSlot)
+    resolved = await count_rows(db, StagingSlot, StagingSlot.resolved == True)
     unresolved = total - resolved
     
     # Vehicle staging
-    v_total = db.query(StagingVehicleSlot).count()
-    v_resolved = db.query(StagingVehicleSlot).filter(StagingVehicleSlot.resolved == True).count()
+    v_total = await count_rows(db, StagingVehicleSlot)
+    v_resolved = await count_rows(db, StagingVehicleSlot, StagingVehicleSlot.resolved == True)
     v_unresolved = v_total - v_resolved
     
     # Get top unresolved tokens
-    top_unresolved = db.query(
+    top_unresolved = await db.execute(select(
         StagingUnresolved.token,
         StagingUnresolved.seen_count,
         StagingUnresolved.sample_raw
     ).order_by(
         StagingUnresolved.seen_count.desc()
-    ).limit(20).all()
+    ).limit(20))
     
     unresolved_list = [
         {
@@ -923,7 +1280,7 @@ def get_staging_status(db: Session = Depends(get_db)):
         for token, count, sample in top_unresolved
     ]
     
-    return StagingStatus(
+    result = StagingStatus(
         total_staging_slots=total,
         resolved=resolved,
         unresolved=unresolved,
@@ -934,56 +1291,85 @@ def get_staging_status(db: Session = Depends(get_db)):
         vehicle_resolution_rate=round(100 * v_resolved / v_total, 2) if v_total > 0 else 0,
         top_unresolved=unresolved_list
     )
-    cache.set(cache_key, result.model_dump(), STATS_CACHE_TTL)
+    await cache.set(cache_key, result.model_dump(), STATS_CACHE_TTL)
     return result
 
 # ============================================================================
 # Search & Query Endpoints
 # ============================================================================
 
-@app.get("/search")
-def global_search(
+# /search runs one UNION ALL over the three tables. Branches share a generic,
+# NULL-padded column layout; per kind: (response model, [(field, slot, column)])
+SEARCH_SLOTS = {
+    "id": Integer, "name": String, "model": String, "mul_id": Integer,
+    "s1": String, "s2": String, "s3": String, "s4": String,
+    "n1": Integer, "f1": Float
+}
+SEARCH_LAYOUT = {
+    "mech": (MechSummary, [
+        ("id", "id", Mech.id), ("chassis", "name", Mech.chassis), ("model", "model", Mech.model),
+        ("mul_id", "mul_id", Mech.mul_id), ("config", "s1", Mech.config),
+        ("techbase", "s2", Mech.techbase), ("era", "s3", Mech.era), ("role", "s4", Mech.role)
+    ]),
+    "vehicle": (VehicleSummary, [
+        ("id", "id", Vehicle.id), ("name", "name", Vehicle.name), ("model", "model", Vehicle.model),
+        ("mul_id", "mul_id", Vehicle.mul_id), ("unit_type", "s1", Vehicle.unit_type),
+        ("role", "s4", Vehicle.role), ("year", "n1", Vehicle.year), ("tonnage", "f1", Vehicle.tonnage)
+    ]),
+    "weapon": (WeaponResponse, [
+        ("id", "id", Weapon.id), ("name", "name", Weapon.name),
+        ("category", "s1", Weapon.category), ("damage", "n1", Weapon.damage)
+    ]),
+}
+
+def search_branch(kind: str, criteria, limit: int):
+    """One UNION ALL branch of /search: `kind` rows matching criteria, capped at limit"""
+    by_slot = {slot: column for _, slot, column in SEARCH_LAYOUT[kind][1]}
+    columns = [literal_column(f"'{kind}'").label("kind")] + [
+        by_slot.get(slot, cast(null(), type_)).label(slot)
+        for slot, type_ in SEARCH_SLOTS.items()
+    ]
+    # wrapped so each branch keeps its own LIMIT (SQLite rejects LIMIT in compound members)
+    return select(select(*columns).where(criteria).limit(limit).subquery())
+
+@app.get("/search", response_class=FastJSONResponse)
+async def global_search(
     q: str = Query(..., min_length=2),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Global search across mechs, vehicles, and weapons.
     Returns combined results.
     """
-    # Search mechs
-    mechs = db.query(Mech).filter(
-        or_(
-            Mech.chassis.ilike(f"%{q}%"),
-            Mech.model.ilike(f"%{q}%")
-        )
-    ).limit(limit // 3).all()
-    
-    # Search vehicles
-    vehicles = db.query(Vehicle).filter(
-        or_(
-            Vehicle.name.ilike(f"%{q}%"),
-            Vehicle.model.ilike(f"%{q}%")
-        )
-    ).limit(limit // 3).all()
+    pattern = f"%{q}%"
+    per_kind = limit // 3
+    rows = await db.execute(union_all(
+        search_branch("mech", or_(Mech.chassis.ilike(pattern), Mech.model.ilike(pattern)), per_kind),
+        search_branch("vehicle", or_(Vehicle.name.ilike(pattern), Vehicle.model.ilike(pattern)), per_kind),
+        search_branch("weapon", Weapon.name.ilike(pattern), per_kind)
+    ))
     
-    # Search weapons
-    weapons = db.query(Weapon).filter(
-        Weapon.name.ilike(f"%{q}%")
-    ).limit(limit // 3).all()
+    results = {kind: [] for kind in SEARCH_LAYOUT}
+    for row in rows:
+        model_cls, fields = SEARCH_LAYOUT[row.kind]
+        results[row.kind].append(model_cls.model_construct(
+            **{field: row._mapping[slot] for field, slot, _ in fields}
+        ))
+    mechs, vehicles, weapons = results["mech"], results["vehicle"], results["weapon"]
     
     return {
         "query": q,
-        "mechs": [MechSummary.from_orm(m) for m in mechs],
-        "vehicles": [VehicleSummary.from_orm(v) for v in vehicles],
-        "weapons": [WeaponResponse.from_orm(w) for w in weapons],
+        "mechs": mechs,
+        "vehicles": vehicles,
+        "weapons": weapons,
         "total_results": len(mechs) + len(vehicles) + len(weapons)
     }
 
-@app.get("/compare/mechs")
-def compare_mechs(
+@app.get("/compare/mechs", response_class=FastJSONResponse)
+async def compare_mechs(
     mech_ids: List[int] = Query(..., description="List of mech IDs to compare"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Compare multiple mechs side-by-side.
@@ -992,33 +1378,52 @@ def compare_mechs(
     if len(mech_ids) > 5:
         raise HTTPException(status_code=400, detail="Maximum 5 mechs for comparison")
     
-    mechs_data = []
-    for mech_id in mech_ids:
-        mech = db.query(Mech).filter(Mech.id == mech_id).first()
-        if mech:
-            # Get weapon summary
-            weapons = db.query(
-                Weapon.name,
-                func.count(WeaponInstance.id)
-            ).join(
-                WeaponInstance
-            ).join(
-                Slot
-            ).join(
-                Location
-            ).filter(
-                Location.mech_id == mech_id
-            ).group_by(Weapon.name).all()
-            
-            mechs_data.append({
-                "mech": MechSummary.from_orm(mech),
-                "weapons": {name: count for name, count in weapons}
-            })
+    # Two queries for the whole set instead of two per mech
+    summaries = {row.id: row for row in rows_to_models(MechSummary, await db.execute(
+        select(*MECH_SUMMARY_COLUMNS).where(Mech.id.in_(mech_ids))
+    ))}
+    weapon_counts = defaultdict(dict)
+    rows = await db.execute(select(
+        Location.mech_id,
+        Weapon.name,
+        func.count(WeaponInstance.id)
+    ).select_from(Weapon).join(
+        WeaponInstance
+    ).join(
+        Slot
+    ).join(
+        Location
+    ).where(
+        Location.mech_id.in_(mech_ids)
+    ).group_by(Location.mech_id, Weapon.name))
+    for mech_id, name, count in rows:
+        weapon_counts[mech_id][name] = count
+    
+    # Keep the requested order; unknown ids are skipped
+    mechs_data = [
+        {"mech": summaries[mech_id], "weapons": weapon_counts[mech_id]}
+        for mech_id in mech_ids if mech_id in summaries
+    ]
     
     return {
         "comparison": mechs_data
     }
 
+# ============================================================================
+# Admin Endpoints
+# ============================================================================
+
+@app.post("/admin/reload-caches", response_class=FastJSONResponse)
+async def reload_caches(db: AsyncSession = Depends(get_db)):
+    """Rebuild the weapon/component-type lookup tables and flush cached responses (run after an ingest)"""
+    await reload_lookup_tables(db)
+    await invalidate_response_cache()
+    return {
+        "weapons": len(WEAPONS_BY_ID),
+        "component_types": len(COMPONENT_TYPE_NAMES),
+        "response_cache": "cleared"
+    }
+
 # ============================================================================
 # Run the API
 # ============================================================================
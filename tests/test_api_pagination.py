@@ -0,0 +1,66 @@
+import importlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from mtf_ingest import Mech, initialize_db
+
+
+class CursorPaginationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(cls.tmp.name) / "api.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        initialize_db(engine)
+        session = sessionmaker(bind=engine)()
+        # Repeated chassis/model pairs so pages split inside a tie on the sort key
+        for i in range(23):
+            session.add(Mech(chassis=f"Chassis {i % 4}", model=None if i % 5 == 0 else f"M{i % 3}"))
+        session.commit()
+        session.close()
+        engine.dispose()
+
+        os.environ["MEK_SQLITE_PATH"] = str(db_path)
+        os.environ["API_CACHE_ENABLED"] = "false"
+        cls.api = importlib.import_module("mek_api.battletech_api")
+        from fastapi.testclient import TestClient
+        cls.client = TestClient(cls.api.app)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+        cls.tmp.cleanup()
+
+    def walk(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=5)
+            if cursor:
+                query["cursor"] = cursor
+            resp = self.client.get("/mechs", params=query)
+            self.assertEqual(resp.status_code, 200)
+            ids.extend(m["id"] for m in resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                return ids
+
+    def test_cursor_walk_matches_full_list(self):
+        full = [m["id"] for m in self.client.get("/mechs", params={"limit": 500}).json()]
+        self.assertEqual(len(full), 23)
+        self.assertEqual(self.walk(), full)
+
+    def test_skip_is_ignored_with_cursor(self):
+        full = [m["id"] for m in self.client.get("/mechs", params={"limit": 500}).json()]
+        first = self.client.get("/mechs", params={"limit": 5, "skip": 5})
+        self.assertEqual([m["id"] for m in first.json()], full[5:10])
+        # skip applies to the first page only; cursor pages continue from the key
+        self.assertEqual(self.walk(skip=5), full[5:])
+
+
+if __name__ == '__main__':
+    unittest.main()
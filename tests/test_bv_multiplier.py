@@ -1,6 +1,6 @@
 import unittest
 
-from mech_bv import get_multiplier_for, compute_adjusted_bv
+from mech_bv import get_multiplier_for, compute_adjusted_bv, compute_adjusted_bv_grid
 
 
 class BVMultiplierTests(unittest.TestCase):
@@ -20,6 +20,13 @@ class BVMultiplierTests(unittest.TestCase):
         self.assertAlmostEqual(res['multiplier'], expected_multiplier, places=6)
         self.assertEqual(res['adjusted_bv'], int(round(base_bv * expected_multiplier)))
 
+    def test_grid_matches_single_lookups(self):
+        grid = compute_adjusted_bv_grid(2340, base_g=4, base_p=5)
+        self.assertEqual(len(grid), 9)
+        for g in range(9):
+            for p in range(9):
+                self.assertEqual(grid[g][p], compute_adjusted_bv(2340, 4, 5, g, p))
+
 
 if __name__ == '__main__':
     unittest.main()